@@ -0,0 +1 @@
+# Performance benchmarks for the seed data generator
@@ -0,0 +1,244 @@
+# Microbenchmarks for the generation hot paths
+#
+# Usage:
+#   python -m benchmarks.bench_generation                    # compare to baseline
+#   python -m benchmarks.bench_generation --update-baseline  # store new baseline
+#   python -m benchmarks.bench_generation --filter insert_ --sizes 1000
+
+import sys
+import logging
+import argparse
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+# Keep generator progress logging out of the benchmark output
+logging.getLogger('src').setLevel(logging.WARNING)
+logger = logging.getLogger('benchmarks')
+
+from config import DATASET_CONFIG, LLM_CONFIG, PROJECT_TYPES, COMMENT_PROBABILITY, SUBTASK_PROBABILITY
+from src import stages
+from src.stages import STAGES
+from src.utils.database import AsanaDatabase
+from src.utils.date_utils import DateGenerator
+from src.generators.organizations import (
+    OrganizationGenerator, TeamGenerator, UserGenerator, TeamMembershipGenerator
+)
+from src.generators.projects import ProjectGenerator
+from src.generators.sections import SectionGenerator
+from src.generators.tasks import TaskGenerator
+from src.generators.stubs import SubtaskGenerator, CommentGenerator, TagGenerator
+from benchmarks.harness import BenchmarkCase, BenchmarkRun, BASELINE_DIR, add_baseline_arguments, finish
+
+SCHEMA_PATH = Path(__file__).parent.parent / 'schema.sql'
+DEFAULT_SIZES = [100, 1000, 10000]
+
+# Parent tables inserted before timing each insert_* path, in FK order
+INSERT_PARENTS = {
+    'users': ['organizations'],
+    'team_memberships': ['organizations', 'teams', 'users'],
+    'projects': ['organizations', 'teams'],
+    'sections': ['organizations', 'teams', 'projects'],
+    'tasks': ['organizations', 'teams', 'users', 'projects', 'sections'],
+    'task_assignees': ['organizations', 'teams', 'users', 'projects', 'sections', 'tasks'],
+    'subtasks': ['organizations', 'teams', 'users', 'projects', 'sections', 'tasks'],
+    'comments': ['organizations', 'teams', 'users', 'projects', 'sections', 'tasks'],
+    'task_tags': ['organizations', 'teams', 'users', 'projects', 'sections', 'tasks', 'tags'],
+}
+
+# Pipeline stage that writes each table; its insert method is the one benchmarked
+TABLE_STAGES = {stage.tables[0]: name for name, stage in STAGES.items()}
+
+
+def new_database() -> AsanaDatabase:
+    """Create an empty in-memory database with the full schema."""
+    db = AsanaDatabase(':memory:', in_memory=True)
+    db.connect()
+    db.executescript(SCHEMA_PATH.read_text())
+    return db
+
+
+def set_tasks_per_project(size: int) -> int:
+    """Size DATASET_CONFIG so generate_tasks() yields about `size` tasks; return project count."""
+    num_projects = max(1, size // 40)
+    DATASET_CONFIG['num_tasks_per_project'] = size // num_projects
+    return num_projects
+
+
+@lru_cache(maxsize=None)
+def build_dataset(size: int) -> dict:
+    """Generate a dataset with `size` users and `size` tasks, keyed by table."""
+    num_projects = set_tasks_per_project(size)
+
+    org = OrganizationGenerator.generate()
+    teams = TeamGenerator.generate_teams(org.organization_id)
+    users = UserGenerator.generate_users(org.organization_id, teams, size)
+    projects = ProjectGenerator.generate_projects(org.organization_id, teams, num_projects)
+    sections = SectionGenerator.generate_sections(projects)
+    tasks = TaskGenerator.generate_tasks(projects, users, sections)
+    tags = TagGenerator.generate_tags(org.organization_id)
+
+    return {
+        'organizations': [org],
+        'teams': teams,
+        'users': users,
+        'team_memberships': TeamMembershipGenerator.generate_memberships(users, teams),
+        'projects': projects,
+        'sections': sections,
+        'tasks': tasks,
+        'task_assignees': TaskGenerator.generate_task_assignments(tasks, users, teams),
+        'subtasks': SubtaskGenerator.generate_subtasks(tasks, SUBTASK_PROBABILITY),
+        'comments': CommentGenerator.generate_comments(tasks, users, COMMENT_PROBABILITY),
+        'tags': tags,
+        'task_tags': TagGenerator.generate_task_tags(tasks, tags),
+    }
+
+
+def insert_records(db: AsanaDatabase, table: str, records: list) -> int:
+    """Insert records the way the pipeline stage for table does and commit; returns the count."""
+    stages.insert_records(db, TABLE_STAGES[table], records)
+    return len(records)
+
+
+@lru_cache(maxsize=None)
+def populated_database(size: int) -> AsanaDatabase:
+    """In-memory database holding the full dataset for size."""
+    db = new_database()
+    for table, records in build_dataset(size).items():
+        insert_records(db, table, records)
+    return db
+
+
+def insert_case(table: str) -> BenchmarkCase:
+    """Benchmark AsanaDatabase.insert_* for table against pre-inserted parents."""
+    def setup(size):
+        dataset = build_dataset(size)
+        db = new_database()
+        for parent in INSERT_PARENTS[table]:
+            insert_records(db, parent, dataset[parent])
+        return db, dataset[table]
+
+    def run(arg):
+        db, records = arg
+        return insert_records(db, table, records)
+
+    return BenchmarkCase(f'db.{STAGES[TABLE_STAGES[table]].insert}', run, setup)
+
+
+def generate_tasks(dataset: dict) -> int:
+    """Benchmark body for TaskGenerator.generate_tasks."""
+    set_tasks_per_project(len(dataset['tasks']))
+    return len(TaskGenerator.generate_tasks(dataset['projects'], dataset['users'], dataset['sections']))
+
+
+def generate_task_assignments(dataset: dict) -> int:
+    """Benchmark body for TaskGenerator.generate_task_assignments (ops = tasks)."""
+    TaskGenerator.generate_task_assignments(dataset['tasks'], dataset['users'], dataset['teams'])
+    return len(dataset['tasks'])
+
+
+def generate_users(dataset: dict) -> int:
+    """Benchmark body for UserGenerator.generate_users."""
+    org_id = dataset['organizations'][0].organization_id
+    return len(UserGenerator.generate_users(org_id, dataset['teams'], len(dataset['users'])))
+
+
+def count_rows(db: AsanaDatabase, calls: int = 100) -> int:
+    """Benchmark body for AsanaDatabase.get_tables_row_count (ops = calls)."""
+    for _ in range(calls):
+        db.get_tables_row_count()
+    return calls
+
+
+def read_assignee_tasks(arg: tuple) -> int:
+    """Benchmark body for AsanaDatabase.get_assignee_tasks (ops = users)."""
+    db, user_ids = arg
+    for user_id in user_ids:
+        db.get_assignee_tasks(user_id)
+    return len(user_ids)
+
+
+def read_case(cache_size: int) -> BenchmarkCase:
+    """Benchmark the typed read API, with the result cache warmed first when cache_size > 0."""
+    def setup(size):
+        db = new_database()
+        for table, records in build_dataset(size).items():
+            insert_records(db, table, records)
+        db.result_cache_size = cache_size
+        arg = db, [user.user_id for user in build_dataset(size)['users']]
+        if cache_size:
+            read_assignee_tasks(arg)
+        return arg
+
+    name = 'db.get_assignee_tasks' + ('.cached' if cache_size else '')
+    return BenchmarkCase(name, read_assignee_tasks, setup)
+
+
+def creation_timestamps(size: int) -> list:
+    """Creation timestamps used as input by the date benchmarks."""
+    return [DateGenerator.generate_creation_timestamp() for _ in range(size)]
+
+
+def get_cases() -> list:
+    """All generation benchmark cases."""
+    project_types = list(PROJECT_TYPES) + [None]
+
+    cases = [
+        BenchmarkCase(
+            'date.generate_creation_timestamp',
+            lambda size: [DateGenerator.generate_creation_timestamp() for _ in range(size)],
+        ),
+        BenchmarkCase(
+            'date.generate_due_date',
+            lambda created: [DateGenerator.generate_due_date(c) for c in created],
+            creation_timestamps,
+        ),
+        BenchmarkCase(
+            'date.generate_completion_timestamp',
+            lambda created: [DateGenerator.generate_completion_timestamp(c) for c in created],
+            creation_timestamps,
+        ),
+        BenchmarkCase(
+            'date.generate_updated_at',
+            lambda created: [DateGenerator.generate_updated_at(c) for c in created],
+            creation_timestamps,
+        ),
+        BenchmarkCase(
+            'tasks.generate_task_name',
+            lambda size: [TaskGenerator.generate_task_name(project_types[i % len(project_types)])
+                          for i in range(size)],
+        ),
+        BenchmarkCase('tasks.generate_tasks', generate_tasks, build_dataset),
+        BenchmarkCase('tasks.generate_task_assignments', generate_task_assignments, build_dataset),
+        BenchmarkCase('users.generate_users', generate_users, build_dataset),
+    ]
+    cases.extend(insert_case(table) for table in INSERT_PARENTS)
+    cases.append(BenchmarkCase('db.get_tables_row_count', count_rows, populated_database))
+    cases.extend([read_case(0), read_case(1000000)])
+    return cases
+
+
+def main(argv: list = None) -> int:
+    """Run the generation benchmarks."""
+    parser = argparse.ArgumentParser(description="Generation microbenchmarks.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help=f"comma-separated sizes (default: {','.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="runs per case; the median is reported (default: 5)")
+    parser.add_argument('--filter', help="only run cases whose name contains this string")
+    add_baseline_arguments(parser, BASELINE_DIR / 'generation.json')
+    args = parser.parse_args(argv)
+
+    # Benchmarks must run offline and measure the template paths
+    LLM_CONFIG['use_llm'] = False
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    logger.info(f"Running generation benchmarks at sizes {sizes} ({datetime.now():%Y-%m-%d %H:%M})")
+    benchmark_run = BenchmarkRun(get_cases(), sizes, args.repeat, args.filter)
+    benchmark_run.run()
+    return finish(args, benchmark_run)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
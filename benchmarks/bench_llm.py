@@ -0,0 +1,130 @@
+# Throughput benchmark for the LLM generation path
+#
+# Runs against the offline 'local' provider, so it needs no network or API
+# key; throughput is bounded by the simulated latency, which makes the
+# sequential / concurrent / batched / cached cases directly comparable.
+#
+# Usage:
+#   python -m benchmarks.bench_llm                    # compare to baseline
+#   python -m benchmarks.bench_llm --update-baseline  # store new baseline
+#   python -m benchmarks.bench_llm --latency-ms 200 --error-rate 0.05 --sizes 500
+
+import sys
+import shutil
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logging.getLogger('src').setLevel(logging.WARNING)
+logger = logging.getLogger('benchmarks')
+
+from config import LLM_CONFIG, LLM_LOCAL_CONFIG, LLM_RESILIENCE_CONFIG
+from src.utils.llm_cache import LLMCache
+from src.utils.llm_client import LLMClient
+from benchmarks.harness import BenchmarkCase, BenchmarkRun, BASELINE_DIR, add_baseline_arguments, finish
+
+DEFAULT_SIZES = [50, 200]
+
+
+def make_items(size: int) -> list:
+    """Distinct task names, one prompt each."""
+    return [{'task_name': f'Benchmark task {i}'} for i in range(size)]
+
+
+def make_client(cache_dir: Path = None) -> LLMClient:
+    """Client on the local provider; cached with one variant per prompt if cache_dir is set."""
+    cache = LLMCache(str(cache_dir / 'llm_cache.sqlite'), variants=1) if cache_dir else None
+    client = LLMClient('local', cache=cache)
+    # The default persistent cache would turn repeated runs into cache hits
+    client.cache = cache
+    return client
+
+
+def get_cases(cache_dir: Path) -> list:
+    """Benchmark cases (ops = generated items)."""
+    def sequential(items):
+        client = make_client()
+        for item in items:
+            client.generate_task_description(item['task_name'])
+        return len(items)
+
+    def concurrent(items):
+        make_client().generate_many('task_description', items)
+        return len(items)
+
+    def batched(items):
+        make_client().generate_batched('task_description', items)
+        return len(items)
+
+    def setup_warm(size):
+        # Fill the cache outside the timed region
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        items = make_items(size)
+        client = make_client(cache_dir)
+        client.generate_many('task_description', items)
+        client.close()
+        return items
+
+    def cached_warm(items):
+        client = make_client(cache_dir)
+        client.generate_many('task_description', items)
+        client.close()
+        return len(items)
+
+    return [
+        BenchmarkCase('llm.sequential', sequential, make_items),
+        BenchmarkCase('llm.concurrent', concurrent, make_items),
+        BenchmarkCase('llm.batched', batched, make_items),
+        BenchmarkCase('llm.cached_warm', cached_warm, setup_warm),
+    ]
+
+
+def main(argv: list = None) -> int:
+    """Run the LLM path benchmarks."""
+    parser = argparse.ArgumentParser(description="LLM path benchmarks against the local mock provider.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"items generated per timed run (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="timed runs per case; the median is reported (default: 3)")
+    parser.add_argument('--filter', help="only run cases whose name contains this string")
+    parser.add_argument('--latency-ms', type=float, default=20,
+                        help="simulated response time (default: 20)")
+    parser.add_argument('--jitter-ms', type=float, default=5,
+                        help="simulated latency jitter (default: 5)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="fraction of simulated calls that fail (default: 0)")
+    parser.add_argument('--concurrency', type=int, default=LLM_CONFIG['concurrency'],
+                        help=f"requests in flight (default: {LLM_CONFIG['concurrency']})")
+    parser.add_argument('--batch-size', type=int, default=LLM_CONFIG['batch_size'],
+                        help=f"items per multi-item request (default: {LLM_CONFIG['batch_size']})")
+    parser.add_argument('--rps', type=float, default=0,
+                        help="client rate limit in requests/sec, 0 for none (default: 0)")
+    add_baseline_arguments(parser, BASELINE_DIR / 'llm.json')
+    args = parser.parse_args(argv)
+
+    LLM_CONFIG.update({'use_llm': True, 'concurrency': args.concurrency, 'batch_size': args.batch_size})
+    LLM_LOCAL_CONFIG.update({
+        'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'error_rate': args.error_rate,
+    })
+    # Keep retry backoff short so injected errors cost time comparable to latency
+    LLM_RESILIENCE_CONFIG.update({'requests_per_second': args.rps, 'backoff_base': 0.01, 'backoff_max': 0.1})
+
+    logger.info(
+        f"Running LLM benchmarks ({datetime.now():%Y-%m-%d %H:%M}): "
+        f"latency {args.latency_ms:g}±{args.jitter_ms:g} ms, error rate {args.error_rate:g}, "
+        f"concurrency {args.concurrency}, batch size {args.batch_size}"
+    )
+    cache_dir = Path(tempfile.mkdtemp(prefix='bench_llm_'))
+    try:
+        benchmark_run = BenchmarkRun(get_cases(cache_dir), args.sizes, args.repeat, args.filter)
+        benchmark_run.run()
+        return finish(args, benchmark_run)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
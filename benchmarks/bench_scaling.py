@@ -0,0 +1,187 @@
+# Scaling-curve benchmark across dataset presets
+#
+# Runs the full pipeline once per scale preset, each in its own process so
+# peak RSS is per run, and tabulates throughput, memory, database size and
+# view query time against scale.
+#
+# Usage:
+#   python -m benchmarks.bench_scaling --presets S,M
+#   python -m benchmarks.bench_scaling --presets S,M,L --csv scaling.csv
+#   python -m benchmarks.bench_scaling --presets M --workers 1,2,4
+
+import os
+import sys
+import csv
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from config import SCALE_PRESETS, RANDOM_SEED
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger('benchmarks')
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Views timed on every generated database
+VIEWS = ['task_overview', 'team_workload', 'user_productivity']
+
+# Stages whose throughput is broken out in the table
+REPORTED_STAGES = ['users', 'tasks', 'task_assignments', 'comments']
+
+
+def run_pipeline(preset: str, db_path: Path, seed: int, extra_args: list) -> dict:
+    """Run the pipeline for preset in a subprocess and return its run report."""
+    command = [
+        sys.executable, '-m', 'src.main',
+        '--scale', preset,
+        '--db', str(db_path),
+        '--seed', str(seed),
+    ] + extra_args
+    logger.info(f"[{preset}] {' '.join(command[1:])}")
+    completed = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Pipeline failed for preset {preset}:\n{completed.stderr[-2000:]}")
+
+    with open(db_path.with_suffix('.run.json')) as f:
+        return json.load(f)
+
+
+def time_views(db_path: Path) -> dict:
+    """Seconds to fully read each view."""
+    timings = {}
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        for view in VIEWS:
+            start = time.perf_counter()
+            conn.execute(f'SELECT COUNT(*) FROM (SELECT * FROM {view})').fetchone()
+            timings[view] = round(time.perf_counter() - start, 4)
+    finally:
+        conn.close()
+    return timings
+
+
+def measure_preset(preset: str, work_dir: Path, seed: int, extra_args: list, label: str = None) -> dict:
+    """Generate preset and collect its scaling metrics."""
+    label = label or preset
+    db_path = work_dir / f"{label.replace('/', '-')}.sqlite"
+    report = run_pipeline(preset, db_path, seed, extra_args)
+    stages = {stage['stage']: stage for stage in report['stages']}
+    totals = report['totals']
+
+    return {
+        'run': label,
+        'preset': preset,
+        'tasks': stages.get('tasks', {}).get('rows', 0),
+        'rows': totals['rows'],
+        'wall_seconds': totals['wall_seconds'],
+        'rows_per_second': totals['rows_per_second'],
+        'peak_rss_mb': round((totals['peak_rss_bytes'] or 0) / (1024 * 1024), 1),
+        'db_size_mb': round(os.path.getsize(db_path) / (1024 * 1024), 1),
+        'stage_rows_per_second': {
+            stage: stages[stage]['rows_per_second'] for stage in REPORTED_STAGES if stage in stages
+        },
+        'view_seconds': time_views(db_path),
+    }
+
+
+def print_table(results: list):
+    """Log scaling results, with throughput relative to the first run."""
+    base_rate = results[0]['rows_per_second'] or 1
+    columns = (
+        f"{'run':<10} {'tasks':>10} {'rows':>11} {'wall s':>9} {'rows/s':>9} {'vs first':>8} "
+        f"{'RSS MB':>8} {'DB MB':>8} "
+        + ' '.join(f'{stage[:10] + " r/s":>14}' for stage in REPORTED_STAGES) + ' '
+        + ' '.join(f'{view[:14] + " s":>16}' for view in VIEWS)
+    )
+    logger.info(columns)
+    logger.info('-' * len(columns))
+    for result in results:
+        logger.info(
+            f"{result['run']:<10} {result['tasks']:>10,} {result['rows']:>11,} "
+            f"{result['wall_seconds']:>9.1f} {result['rows_per_second'] or 0:>9,.0f} "
+            f"{(result['rows_per_second'] or 0) / base_rate:>8.2f} "
+            f"{result['peak_rss_mb']:>8.1f} {result['db_size_mb']:>8.1f} "
+            + ' '.join(f"{result['stage_rows_per_second'].get(stage) or 0:>14,.0f}" for stage in REPORTED_STAGES)
+            + ' '
+            + ' '.join(f"{result['view_seconds'][view]:>16.3f}" for view in VIEWS)
+        )
+
+
+def write_csv(path: Path, results: list):
+    """Write flattened results as CSV."""
+    rows = []
+    for result in results:
+        row = {key: value for key, value in result.items() if not isinstance(value, dict)}
+        row.update({f'{stage}_rows_per_second': rate for stage, rate in result['stage_rows_per_second'].items()})
+        row.update({f'{view}_seconds': seconds for view, seconds in result['view_seconds'].items()})
+        rows.append(row)
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    logger.info(f"CSV written to {path}")
+
+
+def main(argv: list = None) -> int:
+    """Run the scaling benchmark."""
+    parser = argparse.ArgumentParser(description="Pipeline throughput, memory and size across scale presets.")
+    parser.add_argument('--presets', default='S,M',
+                        help=f"comma-separated presets (available: {', '.join(SCALE_PRESETS)}; default: S,M)")
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    parser.add_argument('--in-memory', action='store_true', help="pass --in-memory to the pipeline")
+    parser.add_argument('--workers', default='1',
+                        help="comma-separated pipeline worker counts to run each preset with (default: 1)")
+    parser.add_argument('--work-dir', type=Path,
+                        help="keep generated databases here (default: a temporary directory)")
+    parser.add_argument('--output', type=Path, help="write results as JSON")
+    parser.add_argument('--csv', type=Path, help="write results as CSV")
+    args = parser.parse_args(argv)
+
+    presets = [preset.strip() for preset in args.presets.split(',')]
+    unknown = [preset for preset in presets if preset not in SCALE_PRESETS]
+    if unknown:
+        parser.error(f"unknown preset(s): {', '.join(unknown)}")
+
+    extra_args = ['--in-memory'] if args.in_memory else []
+    worker_counts = [int(count) for count in args.workers.split(',')]
+
+    temp_dir = None
+    if args.work_dir:
+        work_dir = args.work_dir
+        work_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        temp_dir = tempfile.TemporaryDirectory(prefix='asana-scaling-')
+        work_dir = Path(temp_dir.name)
+
+    try:
+        results = [
+            measure_preset(
+                preset, work_dir, args.seed, extra_args + ['--workers', str(workers)],
+                label=preset if len(worker_counts) == 1 else f'{preset}/w{workers}',
+            )
+            for preset in presets
+            for workers in worker_counts
+        ]
+    finally:
+        if temp_dir:
+            temp_dir.cleanup()
+
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results written to {args.output}")
+    if args.csv:
+        write_csv(args.csv, results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+# Startup-time benchmark for the generator entry point
+#
+# Times fresh interpreter processes importing src.main (python -X importtime)
+# and running the CLI, and lists the slowest imports.
+#
+# Usage:
+#   python -m benchmarks.bench_startup                    # compare to baseline
+#   python -m benchmarks.bench_startup --update-baseline  # store new baseline
+#   python -m benchmarks.bench_startup --top 30
+
+import sys
+import logging
+import argparse
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger('benchmarks')
+
+from benchmarks.harness import BenchmarkCase, BenchmarkRun, BASELINE_DIR, add_baseline_arguments, finish
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Startup commands timed per process: case name -> interpreter arguments
+COMMANDS = {
+    'startup.python': ['-c', 'pass'],
+    'startup.import_src_main': ['-X', 'importtime', '-c', 'import src.main'],
+    'startup.list_stages': ['-m', 'src.main', '--list-stages'],
+}
+
+
+def run_python(args: list) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter from the project root."""
+    completed = subprocess.run(
+        [sys.executable] + args, cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"python {' '.join(args)} failed:\n{completed.stderr[-2000:]}")
+    return completed
+
+
+def parse_importtime(stderr: str) -> list:
+    """Parse -X importtime output into (module, self_us, cumulative_us), in import order."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports.append((module.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def startup_case(name: str, args: list) -> BenchmarkCase:
+    """Benchmark starting a process with args (ops = processes)."""
+    def run(processes):
+        for _ in range(processes):
+            run_python(args)
+        return processes
+
+    return BenchmarkCase(name, run)
+
+
+def report_imports(top: int):
+    """Log total import time of src.main and its slowest top-level imports."""
+    imports = parse_importtime(run_python(COMMANDS['startup.import_src_main']).stderr)
+    total = next(cumulative for module, _, cumulative in imports if module == 'src.main')
+    logger.info(f"src.main import: {total / 1000:.1f} ms cumulative")
+
+    logger.info(f"{'module':<50} {'self ms':>9} {'cumul. ms':>10}")
+    for module, self_us, cumulative_us in sorted(imports, key=lambda i: i[2], reverse=True)[:top]:
+        logger.info(f"{module:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>10.1f}")
+
+
+def main(argv: list = None) -> int:
+    """Run the startup benchmarks."""
+    parser = argparse.ArgumentParser(description="Process startup and import-time benchmarks.")
+    parser.add_argument('--processes', type=int, default=5,
+                        help="processes started per timed run (default: 5)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="timed runs per case; the median is reported (default: 5)")
+    parser.add_argument('--top', type=int, default=15,
+                        help="slowest imports to list (default: 15)")
+    add_baseline_arguments(parser, BASELINE_DIR / 'startup.json')
+    args = parser.parse_args(argv)
+
+    logger.info(f"Running startup benchmarks ({datetime.now():%Y-%m-%d %H:%M})")
+    report_imports(args.top)
+
+    cases = [startup_case(name, command) for name, command in COMMANDS.items()]
+    benchmark_run = BenchmarkRun(cases, [args.processes], args.repeat)
+    benchmark_run.run()
+    return finish(args, benchmark_run)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# Response cache fill check for repetitive providers
+#
+# A provider that answers a prompt with the same text every time (temperature
+# 0, short task names) must still fill its cache keys, or every re-run goes
+# back to the provider. The first pass asks each prompt variants_per_prompt
+# times against such a provider; the second pass must be served entirely
+# from the cache. Exits non-zero otherwise.
+#
+# Usage:
+#   python -m benchmarks.check_llm_cache
+#   python -m benchmarks.check_llm_cache --prompts 200 --variants 5
+
+import sys
+import shutil
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logging.getLogger('src').setLevel(logging.WARNING)
+logger = logging.getLogger('benchmarks')
+
+from config import LLM_CONFIG, LLM_CACHE_CONFIG, LLM_RESILIENCE_CONFIG
+from src.utils.llm_cache import LLMCache
+from src.utils.llm_client import LLMClient
+
+
+class RepeatingLLM:
+    """Provider stand-in that returns the same response for a prompt every time."""
+
+    def __init__(self):
+        """Initialize provider."""
+        self.calls = 0
+
+    def complete(self, prompt: str, max_tokens: int = 100, temperature: float = 0.7) -> str:
+        """Return the prompt's one fixed response."""
+        self.calls += 1
+        return f"Response {abs(hash(prompt)) % 10000}"
+
+
+def run_pass(cache_path: Path, variants: int, items: list) -> tuple:
+    """Generate descriptions for items on a fresh client; returns (provider calls, cache stats)."""
+    provider = RepeatingLLM()
+    client = LLMClient('local', cache=LLMCache(str(cache_path), variants=variants))
+    client._initialized = True
+    client.client = provider
+    client.generate_many('task_description', items)
+    stats = client.cache.stats()
+    client.close()
+    return provider.calls, stats
+
+
+def main(argv: list = None) -> int:
+    """Run the check."""
+    parser = argparse.ArgumentParser(description="Check that repeated identical responses fill the LLM cache.")
+    parser.add_argument('--prompts', type=int, default=50, help="distinct prompts (default: 50)")
+    parser.add_argument('--variants', type=int, default=LLM_CACHE_CONFIG['variants_per_prompt'],
+                        help=f"responses per prompt (default: {LLM_CACHE_CONFIG['variants_per_prompt']})")
+    args = parser.parse_args(argv)
+
+    LLM_CONFIG['use_llm'] = True
+    LLM_RESILIENCE_CONFIG['requests_per_second'] = 0
+
+    items = [{'task_name': f'Cache check task {i}'} for i in range(args.prompts)]
+    cache_dir = Path(tempfile.mkdtemp(prefix='check_llm_cache_'))
+    try:
+        cache_path = cache_dir / 'llm_cache.sqlite'
+        calls, _ = run_pass(cache_path, args.variants, items * args.variants)
+        logger.info(f"Fill pass: {calls} provider call(s) for {len(items) * args.variants} request(s)")
+        calls, stats = run_pass(cache_path, args.variants, items)
+        logger.info(f"Second pass: {calls} provider call(s), {stats['cache_hits']} hit(s), "
+                    f"{stats['cache_misses']} miss(es)")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if calls or stats['cache_misses'] or stats['cache_hits'] != len(items):
+        logger.error("FAIL: the second pass was not served entirely from the cache")
+        return 1
+    logger.info("OK: the second pass was served entirely from the cache")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
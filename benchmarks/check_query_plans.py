@@ -0,0 +1,139 @@
+# Query-plan regression check for the documented query set
+#
+# Runs EXPLAIN QUERY PLAN for every query in src/utils/queries.py against a
+# freshly generated (or given) database, compares the plans with the
+# committed snapshot, and exits non-zero if a query now scans a whole table.
+#
+# Usage:
+#   python -m benchmarks.check_query_plans                   # compare to snapshot
+#   python -m benchmarks.check_query_plans --update-snapshot # store new plans
+#   python -m benchmarks.check_query_plans --db output/asana_simulation.sqlite --strict
+
+import re
+import sys
+import json
+import shutil
+import sqlite3
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logging.getLogger('src').setLevel(logging.WARNING)
+logger = logging.getLogger('benchmarks')
+
+from src.utils.queries import QUERY_SET
+from benchmarks.harness import BASELINE_DIR
+
+DEFAULT_SNAPSHOT = BASELINE_DIR / 'query_plans.json'
+
+# A SCAN step that uses no index reads the whole table
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+
+def generate_database(path: Path):
+    """Generate the default dataset at path."""
+    # Imported here: --db runs do not need the pipeline
+    from src.main import DataGenerationPipeline
+    if not DataGenerationPipeline(str(path), in_memory=False, report=False).run():
+        raise RuntimeError("Pipeline failed; cannot check query plans")
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> list:
+    """EXPLAIN QUERY PLAN steps for sql, indented by depth, with parameters bound to NULL."""
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', [None] * sql.count('?')).fetchall()
+    depth = {0: -1}
+    steps = []
+    for node_id, parent_id, _, detail in rows:
+        depth[node_id] = depth.get(parent_id, -1) + 1
+        steps.append('  ' * depth[node_id] + detail)
+    return steps
+
+
+def full_scans(steps: list) -> list:
+    """Tables a plan reads in full."""
+    return [match.group(1) for step in steps if (match := FULL_SCAN.match(step.strip()))]
+
+
+def check(plans: dict, snapshot: dict, strict: bool) -> list:
+    """Compare plans with snapshot; return failure messages."""
+    failures = []
+    for name, steps in plans.items():
+        expected = snapshot.get(name)
+        scans = full_scans(steps)
+        if scans:
+            failures.append(f"{name}: full scan of {', '.join(scans)}")
+        if expected is None:
+            logger.info(f"{name:<24} new (not in snapshot)")
+        elif steps != expected:
+            logger.warning(f"{name:<24} plan changed:")
+            for step in expected:
+                logger.warning(f"    - {step}")
+            for step in steps:
+                logger.warning(f"    + {step}")
+            if strict:
+                failures.append(f"{name}: plan differs from snapshot")
+        else:
+            logger.info(f"{name:<24} ok")
+    return failures
+
+
+def main(argv: list = None) -> int:
+    """Run the query-plan check."""
+    parser = argparse.ArgumentParser(description="Snapshot and check EXPLAIN QUERY PLAN for QUERY_SET.")
+    parser.add_argument('--db', type=Path,
+                        help="database to check (default: generate the default dataset in a temp dir)")
+    parser.add_argument('--snapshot', type=Path, default=DEFAULT_SNAPSHOT,
+                        help=f"plan snapshot JSON (default: {DEFAULT_SNAPSHOT})")
+    parser.add_argument('--update-snapshot', action='store_true',
+                        help="store the current plans as the snapshot instead of comparing")
+    parser.add_argument('--strict', action='store_true',
+                        help="also fail when a plan differs from the snapshot without a full scan")
+    args = parser.parse_args(argv)
+
+    work_dir = None
+    db_path = args.db
+    if db_path is None:
+        work_dir = Path(tempfile.mkdtemp(prefix='query_plans_'))
+        db_path = work_dir / 'plans.sqlite'
+        logger.info("Generating the default dataset...")
+        generate_database(db_path)
+
+    try:
+        conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+        try:
+            plans = {name: explain(conn, sql) for name, (_, sql) in QUERY_SET.items()}
+        finally:
+            conn.close()
+    finally:
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.update_snapshot:
+        args.snapshot.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.snapshot, 'w') as f:
+            json.dump({'sqlite': sqlite3.sqlite_version, 'plans': plans}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        logger.info(f"Snapshot written to {args.snapshot}")
+        return 0
+
+    snapshot = {}
+    if args.snapshot.exists():
+        with open(args.snapshot) as f:
+            snapshot = json.load(f)['plans']
+    else:
+        logger.warning(f"No snapshot at {args.snapshot}; run with --update-snapshot to create one")
+
+    failures = check(plans, snapshot, args.strict)
+    if failures:
+        logger.error(f"{len(failures)} query plan check(s) failed:")
+        for failure in failures:
+            logger.error(f"  {failure}")
+        return 1
+    logger.info("All query plans use indexes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
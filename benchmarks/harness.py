@@ -0,0 +1,225 @@
+# Shared benchmark timing and baseline comparison
+
+import gc
+import json
+import math
+import time
+import random
+import logging
+import platform
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BASELINE_DIR = Path(__file__).parent / 'baselines'
+DEFAULT_THRESHOLD = 0.40  # Fail when calibrated throughput drops by more than 40%
+MIN_COMPARABLE_SECONDS = 0.005  # Shorter baseline timings are too noisy to compare
+
+
+class BenchmarkCase:
+    """
+    A benchmarked code path.
+
+    setup(size) builds the inputs outside the timed region and returns the
+    argument passed to run(). run() performs `size` operations, or returns
+    the number of operations it performed when that differs from size.
+    """
+
+    def __init__(self, name: str, run: Callable, setup: Callable = None):
+        """Initialize case."""
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda size: size)
+
+
+def calibrate(repeat: int = 3) -> float:
+    """
+    Speed of a fixed pure-Python workload in ops/sec.
+    
+    Stored with every result so comparisons can factor out machine-wide
+    speed differences (CPU frequency, noisy neighbours on CI runners).
+    """
+    rng = random.Random(0)
+    values = [rng.random() for _ in range(20000)]
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        buckets = {}
+        for value in values:
+            key = f'{int(value * 100)}'
+            buckets[key] = buckets.get(key, 0) + 1
+        sorted(values)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(len(values) / best, 1)
+
+
+def measure(case: BenchmarkCase, size: int, repeat: int = 5, seed: int = 42) -> dict:
+    """Time case at size; report the median of repeat runs as ops/sec."""
+    timings = []
+    ops = size
+    for _ in range(repeat):
+        random.seed(seed)
+        arg = case.setup(size)
+        # Like timeit, keep collector pauses out of the timed region
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = case.run(arg)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+        if isinstance(result, int):
+            ops = result
+
+    median = statistics.median(timings)
+    return {
+        'size': size,
+        'ops': ops,
+        'best_seconds': round(min(timings), 6),
+        'median_seconds': round(median, 6),
+        'ops_per_sec': round(ops / median, 1) if median > 0 else None,
+        'calibration_ops_per_sec': calibrate(),
+    }
+
+
+class BenchmarkRun:
+    """Results of running cases at several sizes, keyed '<case>@<size>'."""
+
+    def __init__(self, cases: List[BenchmarkCase], sizes: List[int], repeat: int = 5, name_filter: str = None):
+        """Initialize run."""
+        self.repeat = repeat
+        self.results = {}
+        self._index = {}
+        for case in cases:
+            if name_filter and name_filter not in case.name:
+                continue
+            for size in sizes:
+                self._index[f'{case.name}@{size}'] = (case, size)
+
+    def run(self) -> Dict[str, dict]:
+        """Measure every case at every size."""
+        for key in self._index:
+            self.remeasure(key)
+        return self.results
+
+    def remeasure(self, key: str) -> dict:
+        """(Re-)measure a single result."""
+        case, size = self._index[key]
+        self.results[key] = measure(case, size, self.repeat)
+        logger.info(f"{key:<45} {self.results[key]['ops_per_sec']:>14,.0f} ops/s")
+        return self.results[key]
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    """Load a baseline file, or None if it does not exist."""
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_baseline(path: Path, results: Dict[str, dict]):
+    """Store results as the new baseline."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+    logger.info(f"Baseline written to {path}")
+
+
+def compare(results: Dict[str, dict], baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, str]:
+    """
+    Compare results to baseline; return {key: description} for regressions.
+    
+    Throughput is normalized by each side's calibration speed, so a uniformly
+    slower machine does not register as a regression.
+    """
+    regressions = {}
+    for key, result in results.items():
+        expected = baseline['results'].get(key)
+        if not expected or not expected.get('ops_per_sec') or not result['ops_per_sec']:
+            continue
+        if expected['median_seconds'] < MIN_COMPARABLE_SECONDS:
+            logger.info(f"{key:<45} {'':>8}  skipped (under {MIN_COMPARABLE_SECONDS * 1000:g} ms)")
+            continue
+        change = result['ops_per_sec'] / expected['ops_per_sec']
+        if result.get('calibration_ops_per_sec') and expected.get('calibration_ops_per_sec'):
+            change *= expected['calibration_ops_per_sec'] / result['calibration_ops_per_sec']
+        change -= 1
+        status = 'REGRESSION' if change < -threshold else 'ok'
+        logger.info(f"{key:<45} {change:>+8.1%}  {status}")
+        if change < -threshold:
+            regressions[key] = (
+                f"{key}: {result['ops_per_sec']:,.0f} ops/s vs baseline "
+                f"{expected['ops_per_sec']:,.0f} ({change:+.1%} calibrated)"
+            )
+    return regressions
+
+
+def add_baseline_arguments(parser, default_baseline: Path):
+    """Add the common baseline/threshold options to an argparse parser."""
+    parser.add_argument('--baseline', type=Path, default=default_baseline,
+                        help=f"baseline JSON (default: {default_baseline})")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="store this run as the new baseline instead of comparing")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"allowed throughput drop before failing (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--output', type=Path,
+                        help="also write raw results to this JSON file")
+
+
+def finish(args, benchmark_run: BenchmarkRun) -> int:
+    """
+    Write/compare baselines per parsed args; return the process exit code.
+    
+    Cases that regress are measured once more and only fail when the
+    regression reproduces, which filters out one-off scheduler noise.
+    """
+    results = benchmark_run.results
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        write_baseline(args.baseline, results)
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        logger.warning(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        logger.info(f"Re-measuring {len(regressions)} regressed case(s)...")
+        for key in regressions:
+            benchmark_run.remeasure(key)
+        regressions = compare({key: results[key] for key in regressions}, baseline, args.threshold)
+    
+    if regressions:
+        logger.error(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}:")
+        for regression in regressions.values():
+            logger.error(f"  {regression}")
+        return 1
+
+    logger.info("No regressions against baseline")
+    return 0
@@ -0,0 +1,333 @@
+# Read-workload benchmark against a generated database
+#
+# Replays a weighted mix of reporting queries from N reader threads (and
+# optional concurrent writers) and reports latency percentiles and throughput.
+#
+# Usage:
+#   python -m benchmarks.read_workload --threads 8 --duration 30
+#   python -m benchmarks.read_workload --mix user_tasks=5,overdue=1 --writers 2
+
+import sys
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from config import DATABASE_PATH
+from benchmarks.harness import percentile
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger('benchmarks')
+
+# Workload queries: name -> (SQL, parameter pool or None)
+QUERIES = {
+    'task_overview': (
+        'SELECT * FROM task_overview WHERE project_name = ?',
+        'project_names',
+    ),
+    'team_workload': (
+        'SELECT * FROM team_workload',
+        None,
+    ),
+    'user_productivity': (
+        'SELECT * FROM user_productivity WHERE user_id = ?',
+        'user_ids',
+    ),
+    'team_workload_mat': (
+        'SELECT * FROM team_workload_mat',
+        None,
+    ),
+    'user_productivity_mat': (
+        'SELECT * FROM user_productivity_mat WHERE user_id = ?',
+        'user_ids',
+    ),
+    'user_tasks': (
+        '''SELECT t.task_id, t.name, t.due_date, t.status, t.priority
+           FROM task_assignees ta
+           JOIN tasks t ON t.task_id = ta.task_id
+           WHERE ta.user_id = ? AND t.completed = 0
+           ORDER BY t.due_date''',
+        'user_ids',
+    ),
+    'overdue': (
+        '''SELECT task_id, name, due_date, project_id
+           FROM tasks
+           WHERE completed = 0 AND due_date < DATE('now')
+           ORDER BY due_date
+           LIMIT 100''',
+        None,
+    ),
+    'comment_thread': (
+        '''SELECT c.comment_id, c.content, c.created_at, u.name
+           FROM comments c
+           JOIN users u ON u.user_id = c.user_id
+           WHERE c.task_id = ?
+           ORDER BY c.created_at''',
+        'commented_task_ids',
+    ),
+}
+
+DEFAULT_MIX = {
+    'task_overview': 1,
+    'team_workload': 1,
+    'user_productivity': 2,
+    'user_tasks': 4,
+    'overdue': 2,
+    'comment_thread': 4,
+}
+
+# Parameter pools sampled by the queries above
+PARAMETER_POOLS = {
+    'project_names': 'SELECT name FROM projects',
+    'user_ids': 'SELECT user_id FROM users',
+    'commented_task_ids': 'SELECT DISTINCT task_id FROM comments',
+    'task_ids': 'SELECT task_id FROM tasks',
+}
+
+WRITE_QUERY = '''
+    UPDATE tasks
+    SET completed = ?, completed_at = ?, status = ?, updated_at = ?
+    WHERE task_id = ?
+'''
+
+
+def parse_mix(value: str) -> dict:
+    """Parse 'name=weight,...' into a query mix."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in QUERIES:
+            raise argparse.ArgumentTypeError(
+                f"unknown query {name!r}; choose from: {', '.join(QUERIES)}"
+            )
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+def load_parameter_pools(db_path: str) -> dict:
+    """Load the values queries are parameterized with."""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        return {
+            pool: [row[0] for row in conn.execute(query)]
+            for pool, query in PARAMETER_POOLS.items()
+        }
+    finally:
+        conn.close()
+
+
+class WorkloadRunner:
+    """Run reader and writer threads against a database for a fixed duration."""
+
+    def __init__(
+        self,
+        db_path: str,
+        mix: dict,
+        threads: int = 4,
+        writers: int = 0,
+        duration: float = 10.0,
+        write_interval: float = 0.01,
+        persist_writes: bool = False,
+        seed: int = 42
+    ):
+        """Initialize runner."""
+        self.db_path = db_path
+        self.mix = mix
+        self.threads = threads
+        self.writers = writers
+        self.duration = duration
+        self.write_interval = write_interval
+        self.persist_writes = persist_writes
+        self.seed = seed
+        self.pools = load_parameter_pools(db_path)
+        self.latencies = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._deadline = None
+
+    def _record(self, name: str, latencies: list, errors: int):
+        """Merge a thread's measurements into the shared results."""
+        with self._lock:
+            self.latencies.setdefault(name, []).extend(latencies)
+            self.errors[name] = self.errors.get(name, 0) + errors
+
+    def _reader(self, index: int):
+        """Issue queries from the mix until the deadline."""
+        rng = random.Random(self.seed + index)
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        latencies = {name: [] for name in names}
+        errors = {name: 0 for name in names}
+
+        conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True, timeout=30)
+        try:
+            while time.perf_counter() < self._deadline:
+                name = rng.choices(names, weights)[0]
+                query, pool = QUERIES[name]
+                params = (rng.choice(self.pools[pool]),) if pool and self.pools[pool] else ()
+                start = time.perf_counter()
+                try:
+                    conn.execute(query, params).fetchall()
+                except sqlite3.Error:
+                    errors[name] += 1
+                    continue
+                latencies[name].append(time.perf_counter() - start)
+        finally:
+            conn.close()
+
+        for name in names:
+            self._record(name, latencies[name], errors[name])
+
+    def _writer(self, index: int):
+        """Toggle task completion in short write transactions until the deadline."""
+        rng = random.Random(self.seed + 1000 + index)
+        task_ids = self.pools['task_ids']
+        latencies = []
+        errors = 0
+
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            while time.perf_counter() < self._deadline and task_ids:
+                now = datetime.now()
+                completed = rng.random() < 0.5
+                start = time.perf_counter()
+                try:
+                    conn.execute('BEGIN IMMEDIATE')
+                    conn.execute(WRITE_QUERY, (
+                        completed,
+                        now if completed else None,
+                        'completed' if completed else 'in_progress',
+                        now,
+                        rng.choice(task_ids),
+                    ))
+                    conn.execute('COMMIT' if self.persist_writes else 'ROLLBACK')
+                except sqlite3.Error:
+                    errors += 1
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    continue
+                latencies.append(time.perf_counter() - start)
+                time.sleep(self.write_interval)
+        finally:
+            conn.close()
+
+        self._record('write', latencies, errors)
+
+    def run(self) -> dict:
+        """Run the workload and return the report."""
+        workers = [threading.Thread(target=self._reader, args=(i,)) for i in range(self.threads)]
+        workers += [threading.Thread(target=self._writer, args=(i,)) for i in range(self.writers)]
+
+        logger.info(
+            f"Running {self.threads} reader(s) and {self.writers} writer(s) "
+            f"for {self.duration:g}s against {self.db_path}"
+        )
+        start = time.perf_counter()
+        self._deadline = start + self.duration
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> dict:
+        """Summarize latencies per query and overall."""
+        def summarize(latencies: list, errors: int) -> dict:
+            latencies = sorted(latencies)
+            to_ms = lambda value: round(value * 1000, 3) if value is not None else None
+            return {
+                'count': len(latencies),
+                'errors': errors,
+                'throughput_qps': round(len(latencies) / elapsed, 1),
+                'mean_ms': to_ms(sum(latencies) / len(latencies)) if latencies else None,
+                'p50_ms': to_ms(percentile(latencies, 50)),
+                'p95_ms': to_ms(percentile(latencies, 95)),
+                'p99_ms': to_ms(percentile(latencies, 99)),
+            }
+
+        queries = {
+            name: summarize(self.latencies.get(name, []), self.errors.get(name, 0))
+            for name in sorted(self.latencies)
+        }
+        reads = [value for name, values in self.latencies.items() if name != 'write' for value in values]
+        read_errors = sum(count for name, count in self.errors.items() if name != 'write')
+
+        return {
+            'db_path': self.db_path,
+            'threads': self.threads,
+            'writers': self.writers,
+            'duration_seconds': round(elapsed, 3),
+            'mix': self.mix,
+            'queries': queries,
+            'reads': summarize(reads, read_errors),
+        }
+
+
+def print_report(report: dict):
+    """Log the report as a table."""
+    header = f"{'query':<20} {'count':>8} {'qps':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    logger.info(header)
+    logger.info('-' * len(header))
+    rows = list(report['queries'].items()) + [('ALL READS', report['reads'])]
+    for name, stats in rows:
+        logger.info(
+            f"{name:<20} {stats['count']:>8} {stats['throughput_qps']:>10.1f} "
+            f"{stats['p50_ms'] or 0:>9.3f} {stats['p95_ms'] or 0:>9.3f} "
+            f"{stats['p99_ms'] or 0:>9.3f} {stats['errors']:>7}"
+        )
+
+
+def main(argv: list = None) -> int:
+    """Run the read workload."""
+    parser = argparse.ArgumentParser(description="Replay a reporting query mix against a generated database.")
+    parser.add_argument('--db', default=DATABASE_PATH, help=f"database to query (default: {DATABASE_PATH})")
+    parser.add_argument('--threads', type=int, default=4, help="reader threads (default: 4)")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to run (default: 10)")
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help="weighted query mix, e.g. user_tasks=4,overdue=1 "
+                             f"(queries: {', '.join(QUERIES)})")
+    parser.add_argument('--writers', type=int, default=0,
+                        help="concurrent writer threads toggling task completion (default: 0)")
+    parser.add_argument('--write-interval', type=float, default=0.01,
+                        help="pause between a writer's transactions in seconds (default: 0.01)")
+    parser.add_argument('--persist-writes', action='store_true',
+                        help="commit writer transactions instead of rolling them back "
+                             "(modifies the database)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed for query selection")
+    parser.add_argument('--output', type=Path, help="write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if not Path(args.db).exists():
+        logger.error(f"Database not found: {args.db}")
+        return 1
+
+    runner = WorkloadRunner(
+        args.db,
+        args.mix,
+        threads=args.threads,
+        writers=args.writers,
+        duration=args.duration,
+        write_interval=args.write_interval,
+        persist_writes=args.persist_writes,
+        seed=args.seed,
+    )
+    report = runner.run()
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
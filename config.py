@@ -3,6 +3,14 @@
 # Database configuration
 DATABASE_PATH = 'output/asana_simulation.sqlite'
 
+# In-memory build: generate into a ':memory:' database and write it to
+# DATABASE_PATH in one pass at the end. Spills to disk once the in-memory
+# database grows past memory_budget_mb.
+IN_MEMORY_CONFIG = {
+    'enabled': False,
+    'memory_budget_mb': 1024,
+}
+
 # Dataset sizing
 DATASET_CONFIG = {
     'num_organizations': 1,
@@ -14,6 +22,15 @@ DATASET_CONFIG = {
     'date_range_months': 6,
 }
 
+# Named dataset sizes (python -m src.main --scale M); each preset overrides
+# the matching DATASET_CONFIG entries
+SCALE_PRESETS = {
+    'S': {'num_users': 500, 'num_projects': 50, 'num_tasks_per_project': 40},          # 2k tasks
+    'M': {'num_users': 5000, 'num_projects': 500, 'num_tasks_per_project': 200},       # 100k tasks
+    'L': {'num_users': 25000, 'num_projects': 5000, 'num_tasks_per_project': 200},     # 1M tasks
+    'XL': {'num_users': 100000, 'num_projects': 20000, 'num_tasks_per_project': 500},  # 10M tasks
+}
+
 # Team definitions
 TEAMS = [
     {'name': 'Engineering', 'color': '#1F2937'},
@@ -51,12 +68,100 @@ PROJECT_TYPES = {
     },
 }
 
+# Materialized team_workload / user_productivity tables, built after load
+# and kept current by triggers plus an incremental refresh on read
+MATERIALIZED_VIEWS_CONFIG = {
+    'enabled': True,
+}
+
+# Daily created/completed/open/comment counts per project and team, built
+# after load for trend queries
+ROLLUPS_CONFIG = {
+    'enabled': True,
+}
+
+# Optional FTS5 full-text index over task names, descriptions and comment
+# content, built after load and kept in sync by triggers (or pass --search-index)
+SEARCH_INDEX_CONFIG = {
+    'enabled': False,
+    'tokenizer': 'porter unicode61',  # Stemming, Unicode-aware case folding
+    'name_weight': 4.0,  # bm25 weight of task names relative to descriptions
+}
+
+# Typed read API on AsanaDatabase (get_project_tasks() etc.)
+READ_API_CONFIG = {
+    'cached_statements': 256,  # Prepared statements kept per connection
+    'page_size': 500,  # Rows per fetchmany() call
+    'result_cache_size': 0,  # LRU entries of read results; 0 disables the cache
+}
+
 # LLM Configuration
 LLM_CONFIG = {
-    'provider': 'google',  # 'google' or 'openai'
+    'provider': 'google',  # 'google', 'openai' or 'local' (offline mock)
+    'model': None,  # None uses the provider's default model
     'temperature': 0.7,  # For variety with consistency
     'max_tokens': 150,
     'use_llm': True,  # Set to False for template-based generation
+    'concurrency': 8,  # Requests in flight for batch generation
+    'timeout': 30,  # Seconds per request for batch generation
+    'batch_size': 25,  # Items per request for multi-item prompts
+}
+
+# Protection for LLM calls: token-bucket rate limit, exponential-backoff
+# retries, and a circuit breaker that switches to templates after repeated
+# failures and probes again after breaker_reset_seconds
+LLM_RESILIENCE_CONFIG = {
+    'requests_per_second': 10,  # 0 disables rate limiting
+    'burst': 10,
+    'max_retries': 3,
+    'backoff_base': 0.5,  # Seconds before the first retry, doubled per attempt
+    'backoff_max': 8,
+    'breaker_failures': 5,  # Consecutive failed calls that open the circuit
+    'breaker_reset_seconds': 30,
+}
+
+# The 'local' provider: an in-process fake with simulated latency and
+# errors, for running and benchmarking the LLM path offline
+LLM_LOCAL_CONFIG = {
+    'latency_ms': 300,  # Mean simulated response time
+    'jitter_ms': 100,  # Uniform +/- around latency_ms
+    'error_rate': 0.0,  # Fraction of calls that raise
+    'seed': 0,  # Outputs and simulated errors are reproducible per seed
+}
+
+# Persistent LLM response cache: a few response variants per distinct
+# prompt, least recently used evicted past max_entries
+LLM_CACHE_CONFIG = {
+    'enabled': True,
+    'path': 'output/llm_cache.sqlite',
+    'variants_per_prompt': 5,
+    'max_entries': 100000,
+}
+
+# Post-load text enrichment: after the structural data is written, template
+# text is replaced with LLM output page by page (see src/enrichment.py)
+ENRICHMENT_CONFIG = {
+    'enabled': False,  # Or pass --enrich
+    'fields': ['task_name', 'task_description', 'comment'],
+    'chunk_size': 500,  # Rows per page; one commit per page
+}
+
+# Offline content library of LLM-generated text (see
+# src/utils/content_library.py); used instead of the templates when the file
+# exists
+CONTENT_LIBRARY_CONFIG = {
+    'enabled': True,
+    'path': 'output/content_library.bin',
+}
+
+# Streaming export (python -m src.export)
+EXPORT_CONFIG = {
+    'format': 'parquet',  # 'parquet' (needs pandas and pyarrow) or 'csv' (gzip)
+    'output_dir': 'output/export',
+    'chunk_size': 50000,  # Rows per fetchmany() chunk / Parquet row group
+    'workers': 4,  # Tables exported in parallel
+    'parquet_compression': 'snappy',
+    'csv_compresslevel': 6,
 }
 
 # Task distribution parameters (based on Asana benchmarks)
@@ -104,6 +209,13 @@ DEFAULT_TAGS = [
 WORKDAYS = [0, 1, 2, 3, 4]  # Monday to Friday
 PEAK_CREATION_DAYS = [0, 1, 2]  # Mon, Tue, Wed
 
+# Run instrumentation: a JSON run report (and optionally a Prometheus text
+# file) is written next to the database after every pipeline run
+METRICS_CONFIG = {
+    'report': True,
+    'prometheus': False,
+}
+
 # Logging configuration
 LOG_LEVEL = 'INFO'
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
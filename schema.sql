@@ -5,7 +5,17 @@
 -- with support for organizations, teams, users, projects, tasks, and more.
 -- =============================================================================
 
--- Drop existing tables (for fresh start)
+-- Drop existing views and tables (for fresh start)
+DROP VIEW IF EXISTS task_overview;
+DROP VIEW IF EXISTS team_workload;
+DROP VIEW IF EXISTS user_productivity;
+DROP TABLE IF EXISTS team_workload_mat;
+DROP TABLE IF EXISTS user_productivity_mat;
+DROP TABLE IF EXISTS materialized_dirty;
+DROP TABLE IF EXISTS tasks_fts;
+DROP TABLE IF EXISTS comments_fts;
+DROP TABLE IF EXISTS daily_project_rollup;
+DROP TABLE IF EXISTS daily_team_rollup;
 DROP TABLE IF EXISTS task_tags;
 DROP TABLE IF EXISTS task_assignees;
 DROP TABLE IF EXISTS tags;
@@ -87,7 +97,7 @@ CREATE TABLE team_memberships (
     UNIQUE(team_id, user_id)
 );
 
-CREATE INDEX idx_team_memberships_team_id ON team_memberships(team_id);
+-- Team lookups use the UNIQUE(team_id, user_id) index
 CREATE INDEX idx_team_memberships_user_id ON team_memberships(user_id);
 
 -- =============================================================================
@@ -154,10 +164,17 @@ CREATE TABLE tasks (
     FOREIGN KEY (created_by_id) REFERENCES users(user_id) ON DELETE SET NULL
 );
 
-CREATE INDEX idx_tasks_project_id ON tasks(project_id);
-CREATE INDEX idx_tasks_section_id ON tasks(section_id);
+-- Composite indexes serve the queries in src/utils/queries.py (QUERY_SET)
+-- and also cover the project_id / section_id lookups
+CREATE INDEX idx_tasks_project_status ON tasks(project_id, status);
+CREATE INDEX idx_tasks_section_created ON tasks(section_id, created_at);
+
+-- Partial indexes over open tasks only, so open and overdue queries cost in
+-- proportion to open work rather than all history. A query must repeat the
+-- `completed = 0` term literally for SQLite to use them.
+CREATE INDEX idx_tasks_project_open ON tasks(project_id, due_date) WHERE completed = 0;
+CREATE INDEX idx_tasks_open_due ON tasks(due_date) WHERE completed = 0;
 CREATE INDEX idx_tasks_due_date ON tasks(due_date);
-CREATE INDEX idx_tasks_completed ON tasks(completed);
 CREATE INDEX idx_tasks_created_at ON tasks(created_at);
 CREATE INDEX idx_tasks_parent_task_id ON tasks(parent_task_id);
 
@@ -176,8 +193,9 @@ CREATE TABLE task_assignees (
     UNIQUE(task_id, user_id)
 );
 
-CREATE INDEX idx_task_assignees_task_id ON task_assignees(task_id);
-CREATE INDEX idx_task_assignees_user_id ON task_assignees(user_id);
+-- Task lookups use the UNIQUE(task_id, user_id) index; (user_id, task_id)
+-- covers a user's assignments without touching the table
+CREATE INDEX idx_task_assignees_user_task ON task_assignees(user_id, task_id);
 CREATE INDEX idx_task_assignees_assigned_at ON task_assignees(assigned_at);
 
 -- =============================================================================
@@ -218,8 +236,8 @@ CREATE TABLE comments (
     FOREIGN KEY (parent_comment_id) REFERENCES comments(comment_id) ON DELETE SET NULL
 );
 
-CREATE INDEX idx_comments_task_id ON comments(task_id);
-CREATE INDEX idx_comments_user_id ON comments(user_id);
+CREATE INDEX idx_comments_task_created ON comments(task_id, created_at);
+CREATE INDEX idx_comments_user_created ON comments(user_id, created_at);
 CREATE INDEX idx_comments_created_at ON comments(created_at);
 CREATE INDEX idx_comments_parent_comment_id ON comments(parent_comment_id);
 
@@ -286,8 +304,8 @@ CREATE TABLE task_tags (
     UNIQUE(task_id, tag_id)
 );
 
-CREATE INDEX idx_task_tags_task_id ON task_tags(task_id);
-CREATE INDEX idx_task_tags_tag_id ON task_tags(tag_id);
+-- Task lookups use the UNIQUE(task_id, tag_id) index
+CREATE INDEX idx_task_tags_tag_task ON task_tags(tag_id, task_id);
 
 -- =============================================================================
 -- VIEWS FOR COMMON QUERIES
@@ -337,10 +355,18 @@ SELECT
         CAST(SUM(CASE WHEN t.completed = 1 THEN 1 ELSE 0 END) AS FLOAT) / 
         NULLIF(COUNT(DISTINCT ta.task_id), 0) * 100, 2
     ) as completion_percentage,
-    COUNT(DISTINCT ta.task_id) FILTER (WHERE t.due_date < DATE('now') AND t.completed = 0) as overdue_tasks
+    COALESCE(od.overdue_tasks, 0) as overdue_tasks
 FROM users u
 LEFT JOIN task_assignees ta ON u.user_id = ta.user_id
 LEFT JOIN tasks t ON ta.task_id = t.task_id
+-- Overdue counts walk idx_tasks_open_due and join assignees by task_id
+LEFT JOIN (
+    SELECT ota.user_id, COUNT(*) as overdue_tasks
+    FROM tasks ot
+    JOIN task_assignees ota ON ota.task_id = ot.task_id
+    WHERE ot.completed = 0 AND ot.due_date < DATE('now')
+    GROUP BY ota.user_id
+) od ON od.user_id = u.user_id
 GROUP BY u.user_id, u.name;
 
 -- =============================================================================
@@ -1,8 +1,14 @@
 # Initialize src module
-from src.utils.database import AsanaDatabase
-from src.utils.llm_client import LLMClient
-from src.utils.date_utils import DateGenerator
-from src.utils.validators import DataValidator
+# Exports are imported on first access, so importing one submodule does not
+# load the others (see benchmarks/bench_startup.py)
+import importlib
+
+_EXPORTS = {
+    'AsanaDatabase': 'src.utils.database',
+    'LLMClient': 'src.utils.llm_client',
+    'DateGenerator': 'src.utils.date_utils',
+    'DataValidator': 'src.utils.validators',
+}
 
 __all__ = [
     'AsanaDatabase',
@@ -10,3 +16,9 @@ __all__ = [
     'DateGenerator',
     'DataValidator',
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
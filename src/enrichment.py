@@ -0,0 +1,158 @@
+# Backfill generated text with LLM output after the structural load
+
+import logging
+from collections import deque
+from typing import Optional
+from config import ENRICHMENT_CONFIG, LLM_CONFIG
+from src.utils.database import AsanaDatabase
+from src.utils.llm_client import LLMClient
+
+logger = logging.getLogger(__name__)
+
+# Fields that can be enriched, in the order they run: descriptions are
+# prompted with the (enriched) task name, comments with their task's name
+ENRICHMENT_FIELDS = ('task_name', 'task_description', 'comment')
+
+# Pages whose requests are in flight at once; LLM_CONFIG['concurrency'] is
+# split between them
+PAGES_IN_FLIGHT = 2
+
+TASK_PAGE_SQL = '''
+SELECT t.task_id, t.name, t.description IS NOT NULL AS has_description, p.project_type
+FROM tasks t JOIN projects p ON p.project_id = t.project_id
+WHERE t.task_id > ?
+ORDER BY t.task_id
+LIMIT ?
+'''
+
+COMMENT_PAGE_SQL = '''
+SELECT c.comment_id, t.name
+FROM comments c JOIN tasks t ON t.task_id = c.task_id
+WHERE c.comment_id > ?
+ORDER BY c.comment_id
+LIMIT ?
+'''
+
+
+def _skip(item: dict) -> None:
+    """Fallback that keeps the template text already in the database."""
+    return None
+
+
+class TextEnricher:
+    """
+    Replace template text in a loaded database with LLM-generated text.
+
+    Rows are read in pages of chunk_size (keyset paging on the primary key),
+    each page's text is requested with multi-item prompts run concurrently
+    by LLMClient, and the results are written back with batched UPDATEs and
+    one commit per page. The next page is requested before the current one
+    finishes, so the provider is never idle while a page is written. Items
+    the LLM fails on keep their template text, so the database stays
+    complete and usable throughout.
+    """
+
+    def __init__(self, db: AsanaDatabase, client: LLMClient = None, fields: list = None, chunk_size: int = None):
+        """Initialize enricher; defaults come from ENRICHMENT_CONFIG."""
+        self.db = db
+        self.client = client or LLMClient()
+        self.fields = [f for f in ENRICHMENT_FIELDS if f in (fields or ENRICHMENT_CONFIG['fields'])]
+        self.chunk_size = chunk_size or ENRICHMENT_CONFIG['chunk_size']
+        self.concurrency = max(1, LLM_CONFIG['concurrency'] // PAGES_IN_FLIGHT)
+        self.updated = {field: 0 for field in self.fields}
+
+    def run(self) -> dict:
+        """Enrich the configured fields; returns updated row counts per field."""
+        if not self.client.enabled:
+            logger.warning("LLM unavailable, skipping text enrichment")
+            return self.updated
+
+        # asyncio is only needed when enrichment actually runs
+        import asyncio
+        asyncio.run(self._run())
+        logger.info(f"Enriched text: {self.updated}")
+        return self.updated
+
+    async def _run(self):
+        """Enrich tasks, then comments."""
+        if 'task_name' in self.fields or 'task_description' in self.fields:
+            await self._pipeline(TASK_PAGE_SQL, self._enrich_tasks, self._write_tasks)
+        if 'comment' in self.fields:
+            await self._pipeline(COMMENT_PAGE_SQL, self._enrich_comments, self._write_comments)
+
+    async def _pipeline(self, page_sql: str, enrich, write):
+        """Fetch pages and enrich up to PAGES_IN_FLIGHT at once, writing each in order as it completes."""
+        import asyncio
+
+        def fetch(after: str) -> list:
+            return [tuple(row) for row in self.db.execute(page_sql, (after, self.chunk_size)).fetchall()]
+
+        rows = fetch('')
+        in_flight = deque()
+        while rows or in_flight:
+            while rows and len(in_flight) < PAGES_IN_FLIGHT:
+                in_flight.append(asyncio.ensure_future(enrich(rows)))
+                rows = fetch(rows[-1][0]) if len(rows) == self.chunk_size else []
+            write(await in_flight.popleft())
+
+    async def _enrich_tasks(self, rows: list) -> list:
+        """(task_id, name or None, description or None) for a page of tasks."""
+        names = [None] * len(rows)
+        if 'task_name' in self.fields:
+            items = [{'project_type': project_type or '', 'context': ''} for _, _, _, project_type in rows]
+            names = await self.client.generate_batched_async(
+                'task_name', items, fallback=_skip, concurrency=self.concurrency
+            )
+
+        descriptions = [None] * len(rows)
+        if 'task_description' in self.fields:
+            described = [i for i, row in enumerate(rows) if row[2]]
+            items = [{'task_name': names[i] or rows[i][1]} for i in described]
+            generated = await self.client.generate_batched_async(
+                'task_description', items, fallback=_skip, concurrency=self.concurrency
+            )
+            for i, description in zip(described, generated):
+                descriptions[i] = description
+
+        return [(row[0], name, description) for row, name, description in zip(rows, names, descriptions)]
+
+    def _write_tasks(self, results: list):
+        """Backfill a page of task names and descriptions."""
+        params = [
+            (name, description, task_id)
+            for task_id, name, description in results
+            if name is not None or description is not None
+        ]
+        self.db.executemany(
+            'UPDATE tasks SET name = COALESCE(?, name), description = COALESCE(?, description) '
+            'WHERE task_id = ?',
+            params
+        )
+        self.db.commit()
+        if 'task_name' in self.updated:
+            self.updated['task_name'] += sum(1 for _, name, _ in results if name is not None)
+        if 'task_description' in self.updated:
+            self.updated['task_description'] += sum(1 for *_, description in results if description is not None)
+
+    async def _enrich_comments(self, rows: list) -> list:
+        """(comment_id, content or None) for a page of comments."""
+        items = [{'task_name': task_name} for _, task_name in rows]
+        contents = await self.client.generate_batched_async(
+            'comment', items, fallback=_skip, concurrency=self.concurrency
+        )
+        return [(comment_id, content) for (comment_id, _), content in zip(rows, contents)]
+
+    def _write_comments(self, results: list):
+        """Backfill a page of comment contents."""
+        params = [(content, comment_id) for comment_id, content in results if content is not None]
+        self.db.executemany('UPDATE comments SET content = ? WHERE comment_id = ?', params)
+        self.db.commit()
+        self.updated['comment'] += len(params)
+
+    def get_stats(self) -> Optional[dict]:
+        """LLM client stats (requests, failures, fallbacks, cache hit rate)."""
+        return self.client.get_stats()
+
+    def close(self):
+        """Close the LLM client and its response cache."""
+        self.client.close()
@@ -0,0 +1,254 @@
+# Streaming export of the generated database to Parquet or gzip CSV
+#
+#   python -m src.export                                  # every schema.sql table to Parquet
+#   python -m src.export --format csv --workers 4
+#   python -m src.export --tables tasks,comments --chunk-size 20000 --out /tmp/export
+#
+# Each table is read with fetchmany() and every chunk is written before the
+# next is fetched (one Parquet row group, or CSV lines through gzip), so
+# memory depends on chunk_size and the worker count, not on table size.
+# Tables are exported in parallel worker processes, each with its own
+# read-only connection. Column types come from the types declared in
+# schema.sql; they are applied explicitly to every chunk and recorded in
+# manifest.json next to the exported files.
+
+import re
+import csv
+import sys
+import gzip
+import json
+import os
+import time
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+from config import DATABASE_PATH, EXPORT_CONFIG
+from src.utils.scheduler import get_executor, map_unordered, shutdown_executor
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = Path(__file__).parent.parent / 'schema.sql'
+
+FORMATS = ('parquet', 'csv')
+EXTENSIONS = {'parquet': '.parquet', 'csv': '.csv.gz'}
+
+# Declared SQLite column type -> export dtype; anything else is exported as string
+COLUMN_TYPES = {
+    'TEXT': 'string',
+    'INTEGER': 'int64',
+    'BOOLEAN': 'bool',
+    'REAL': 'float64',
+    'FLOAT': 'float64',
+    'TIMESTAMP': 'timestamp',
+    'DATE': 'date',
+}
+
+# Nullable pandas dtypes; timestamps and dates are parsed with to_datetime()
+PANDAS_DTYPES = {
+    'string': 'string',
+    'int64': 'Int64',
+    'bool': 'boolean',
+    'float64': 'Float64',
+}
+
+
+def schema_tables() -> List[str]:
+    """Tables created by schema.sql, in creation (foreign key) order."""
+    return re.findall(r'^CREATE TABLE (\w+)', SCHEMA_PATH.read_text(), re.MULTILINE)
+
+
+def column_types(conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+    """Export dtype of each column of table, in column order."""
+    return {
+        name: COLUMN_TYPES.get(declared.upper(), 'string')
+        for _, name, declared, *_ in conn.execute(f'PRAGMA table_info({table})')
+    }
+
+
+def arrow_schema(types: Dict[str, str]):
+    """Arrow schema for a table's export dtypes."""
+    import pyarrow as pa
+    arrow_types = {
+        'string': pa.string(),
+        'int64': pa.int64(),
+        'bool': pa.bool_(),
+        'float64': pa.float64(),
+        'timestamp': pa.timestamp('us'),
+        'date': pa.date32(),
+    }
+    return pa.schema([(name, arrow_types[dtype]) for name, dtype in types.items()])
+
+
+def to_frame(rows: list, types: Dict[str, str]):
+    """DataFrame of a chunk of rows with every column cast to its export dtype."""
+    import pandas as pd
+    frame = pd.DataFrame.from_records(rows, columns=list(types))
+    for column, dtype in types.items():
+        if dtype in ('timestamp', 'date'):
+            frame[column] = pd.to_datetime(frame[column], format='ISO8601')
+        else:
+            frame[column] = frame[column].astype(PANDAS_DTYPES[dtype])
+    return frame
+
+
+def write_parquet(cursor: sqlite3.Cursor, types: Dict[str, str], path: Path, chunk_size: int) -> int:
+    """Write the cursor's rows to a Parquet file, one row group per chunk; returns the row count."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = arrow_schema(types)
+    count = 0
+    with pq.ParquetWriter(path, schema, compression=EXPORT_CONFIG['parquet_compression']) as writer:
+        while rows := cursor.fetchmany(chunk_size):
+            writer.write_table(pa.Table.from_pandas(to_frame(rows, types), schema=schema, preserve_index=False))
+            count += len(rows)
+    return count
+
+
+def write_csv(cursor: sqlite3.Cursor, types: Dict[str, str], path: Path, chunk_size: int) -> int:
+    """
+    Write the cursor's rows to a gzip CSV file with a header row; returns the row count.
+
+    Values are written as stored: timestamps and dates as ISO 8601 text,
+    booleans as 0/1, NULL as an empty field.
+    """
+    count = 0
+    with gzip.open(path, 'wt', newline='', encoding='utf-8', compresslevel=EXPORT_CONFIG['csv_compresslevel']) as f:
+        writer = csv.writer(f)
+        writer.writerow(types)
+        while rows := cursor.fetchmany(chunk_size):
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def export_table(db_path: str, table: str, out_dir: str, fmt: str, chunk_size: int) -> dict:
+    """
+    Export one table; runs inline or in a worker process.
+
+    The file is written under a temporary name and moved into place, so a
+    failed export never leaves a partial file. Returns its manifest entry.
+    """
+    start = time.perf_counter()
+    path = Path(out_dir) / f'{table}{EXTENSIONS[fmt]}'
+    tmp_path = path.with_name(f'{path.name}.tmp')
+
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        types = column_types(conn, table)
+        cursor = conn.execute(f'SELECT * FROM {table}')
+        write = write_parquet if fmt == 'parquet' else write_csv
+        rows = write(cursor, types, tmp_path, chunk_size)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+    return {
+        'file': path.name,
+        'rows': rows,
+        'bytes': path.stat().st_size,
+        'seconds': round(time.perf_counter() - start, 3),
+        'columns': types,
+    }
+
+
+def export_database(
+    db_path: str = DATABASE_PATH,
+    out_dir: str = None,
+    fmt: str = None,
+    tables: List[str] = None,
+    workers: int = None,
+    chunk_size: int = None
+) -> dict:
+    """
+    Export tables (default: every schema.sql table) of db_path to out_dir.
+
+    Defaults come from EXPORT_CONFIG. Writes and returns the manifest:
+    format, source database and, per table, file name, row count, size
+    and column dtypes.
+    """
+    fmt = fmt or EXPORT_CONFIG['format']
+    out_dir = Path(out_dir or EXPORT_CONFIG['output_dir'])
+    workers = workers or EXPORT_CONFIG['workers']
+    chunk_size = chunk_size or EXPORT_CONFIG['chunk_size']
+    tables = tables or schema_tables()
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (expected one of {FORMATS})")
+    if fmt == 'parquet':
+        # Checked up front so a missing dependency fails before any worker starts
+        try:
+            import pandas
+            import pyarrow
+        except ImportError:
+            raise RuntimeError("Parquet export needs pandas and pyarrow installed; or use --format csv")
+    if not Path(db_path).exists():
+        raise FileNotFoundError(f"Database not found: {db_path}")
+
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        existing = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    missing = [table for table in tables if table not in existing]
+    if missing:
+        raise ValueError(f"Tables not in {db_path}: {', '.join(missing)}")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Exporting {len(tables)} tables from {db_path} to {out_dir} ({fmt}, {workers} worker(s))")
+
+    entries = {}
+    calls = ((str(db_path), table, str(out_dir), fmt, chunk_size) for table in tables)
+    executor = get_executor(workers)
+    try:
+        for (_, table, *_), entry in map_unordered(executor, export_table, calls, workers):
+            entries[table] = entry
+            logger.info(f"  {table}: {entry['rows']} rows, {entry['bytes'] / 1024:.0f} KiB in {entry['seconds']}s")
+    finally:
+        shutdown_executor(executor)
+
+    manifest = {
+        'format': fmt,
+        'database': str(db_path),
+        'exported_at': datetime.now().isoformat(timespec='seconds'),
+        'tables': {table: entries[table] for table in tables},
+    }
+    with open(out_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"Wrote {out_dir / 'manifest.json'}")
+    return manifest
+
+
+def main(argv: list = None) -> int:
+    """Command-line entry point."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Export the generated database to Parquet or gzip CSV.")
+    parser.add_argument('--db', default=DATABASE_PATH, help=f"database to export (default: {DATABASE_PATH})")
+    parser.add_argument('--out', default=EXPORT_CONFIG['output_dir'],
+                        help=f"output directory (default: {EXPORT_CONFIG['output_dir']})")
+    parser.add_argument('--format', choices=FORMATS, default=EXPORT_CONFIG['format'],
+                        help=f"file format (default: {EXPORT_CONFIG['format']})")
+    parser.add_argument('--tables', type=lambda value: [t.strip() for t in value.split(',') if t.strip()],
+                        help="comma-separated tables (default: every table in schema.sql)")
+    parser.add_argument('--workers', type=int, default=EXPORT_CONFIG['workers'], metavar='N',
+                        help=f"tables exported in parallel (default: {EXPORT_CONFIG['workers']})")
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CONFIG['chunk_size'], metavar='ROWS',
+                        help=f"rows per fetchmany() chunk (default: {EXPORT_CONFIG['chunk_size']})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    try:
+        export_database(args.db, args.out, args.format, args.tables, max(1, args.workers), args.chunk_size)
+    except (ValueError, RuntimeError, FileNotFoundError) as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
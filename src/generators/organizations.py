@@ -25,13 +25,20 @@ class OrganizationGenerator:
     ]
     
     @staticmethod
-    def generate(org_id: str = None) -> Organization:
-        """Generate single organization."""
+    def generate(org_id: str = None, index: int = None) -> Organization:
+        """
+        Generate single organization.
+        
+        index numbers the organization within a multi-tenant dataset; every
+        organization after the first gets it appended to its domain so
+        domains stay unique when company names repeat.
+        """
         if org_id is None:
             org_id = str(uuid.uuid4())
         
         name = random.choice(OrganizationGenerator.COMPANY_NAMES)
-        domain = name.lower().replace(' ', '') + '.com'
+        slug = name.lower().replace(' ', '')
+        domain = f"{slug}-{index}.com" if index else f"{slug}.com"
         
         return Organization(
             organization_id=org_id,
@@ -104,7 +111,8 @@ class UserGenerator:
     def generate_users(
         organization_id: str,
         teams: list,
-        num_users: int = None
+        num_users: int = None,
+        email_domain: str = 'example.com'
     ) -> list:
         """Generate users and assign to teams."""
         if num_users is None:
@@ -122,7 +130,7 @@ class UserGenerator:
                 user_id=str(uuid.uuid4()),
                 organization_id=organization_id,
                 name=f"{first_name} {last_name}",
-                email=f"{first_name.lower()}.{last_name.lower()}_{i}@example.com",
+                email=f"{first_name.lower()}.{last_name.lower()}_{i}@{email_domain}",
                 first_name=first_name,
                 last_name=last_name,
                 created_at=datetime.now(),
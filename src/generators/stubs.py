@@ -33,6 +33,8 @@ import random
 import logging
 from datetime import timedelta
 from src.models.data_models import Comment
+from src.utils.text_pools import TextPool
+from src.utils.content_library import get_section
 
 logger = logging.getLogger(__name__)
 
@@ -47,10 +49,12 @@ class CommentGenerator:
         "Ready for testing phase.",
         "Please address the feedback.",
     ]
+    COMMENT_POOL = TextPool.uniform(COMMENT_TEMPLATES)
     
     @staticmethod
     def generate_comments(tasks: list, users: list, probability=0.50):
         comments = []
+        pool = get_section('comment') or CommentGenerator.COMMENT_POOL
         for task in tasks:
             if random.random() < probability and users:
                 num_comments = random.randint(1, 3)
@@ -60,7 +64,7 @@ class CommentGenerator:
                         comment_id=str(uuid.uuid4()),
                         task_id=task.task_id,
                         user_id=random.choice(users).user_id,
-                        content=random.choice(CommentGenerator.COMMENT_TEMPLATES),
+                        content=pool.draw(),
                         created_at=comment_time,
                     )
                     comments.append(comment)
@@ -3,10 +3,14 @@
 import uuid
 import random
 import logging
+import itertools
 from datetime import datetime
+from functools import lru_cache
 from config import DATASET_CONFIG, TASK_DISTRIBUTIONS, DEFAULT_TAGS
 from src.models.data_models import Task, TaskAssignee, Comment, TaskTag
 from src.utils.date_utils import DateGenerator
+from src.utils.text_pools import TextPool
+from src.utils.content_library import get_section
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +32,88 @@ class TaskGenerator:
         ],
     }
     
+    # Task name templates per project type: (template, choices per placeholder);
+    # None is the generic naming used for any other project type
+    TASK_NAME_TEMPLATES = {
+        'engineering': ('{} - {} - {}', [
+            ['API', 'Database', 'Frontend', 'Backend', 'Cache', 'Queue'],
+            TASK_ACTIONS['engineering'],
+            ['for performance', 'for security', 'for scalability', 'for reliability'],
+        ]),
+        'marketing': ('{} - {}', [
+            ['Q1 Campaign', 'Social Media', 'Email Marketing', 'Content'],
+            ['Design', 'Copy', 'Analytics Report', 'Strategy'],
+        ]),
+        'operations': ('{} - {}', [
+            ['Onboarding', 'Budget', 'Procurement', 'Compliance'],
+            ['Planning', 'Review', 'Audit', 'Update'],
+        ]),
+        None: ('{}', [
+            ['Task for {}', '{} needs review', 'Complete {} task'],
+        ]),
+    }
+    GENERIC_SUBJECTS = ['feature', 'bug fix', 'enhancement']
+    
+    DESCRIPTION_SENTENCES = [
+        "This task requires implementation of the specified feature.",
+        "Please complete this work according to the acceptance criteria.",
+        "Review the requirements and provide updates.",
+    ]
+    NO_DESCRIPTION_RATE = 0.20
+    DESCRIPTION_DETAILS = [
+        "Requirements:\n• Implement feature\n• Add unit tests\n• Document code",
+        "Tasks:\n• Research the topic\n• Create design spec\n• Get stakeholder approval",
+        "Checklist:\n- Review existing code\n- Design new approach\n- Implement solution\n- Test thoroughly",
+    ]
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def name_pool(project_type: str = None) -> TextPool:
+        """
+        Every task name for a project type: the content library's names if
+        it has some, else the templates expanded on first use.
+        """
+        section = get_section('task_name', project_type)
+        if section is not None:
+            return section
+        if project_type not in TaskGenerator.TASK_NAME_TEMPLATES:
+            project_type = None
+        template, choices = TaskGenerator.TASK_NAME_TEMPLATES[project_type]
+        if project_type is None:
+            return TextPool.uniform(
+                name.format(subject)
+                for name in choices[0]
+                for subject in TaskGenerator.GENERIC_SUBJECTS
+            )
+        return TextPool.expand(template, *choices)
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def description_pool() -> TextPool:
+        """
+        Every template task description: 20% none, 30% one to three
+        sentences in random order, 50% one of the detailed checklists.
+        """
+        sentences = TaskGenerator.DESCRIPTION_SENTENCES
+        short = TextPool.mix([
+            (1 / 3, TextPool.uniform(" ".join(p) for p in itertools.permutations(sentences, count)))
+            for count in range(1, len(sentences) + 1)
+        ])
+        return TextPool.mix([
+            (TaskGenerator.NO_DESCRIPTION_RATE, TextPool.uniform([None])),
+            (0.30, short),
+            (0.50, TextPool.uniform(TaskGenerator.DESCRIPTION_DETAILS)),
+        ])
+    
+    @staticmethod
+    def draw_descriptions(project_type: str, count: int) -> list:
+        """count task descriptions, from the content library if it has some."""
+        section = get_section('task_description', project_type)
+        if section is None:
+            return TaskGenerator.description_pool().draw_many(count)
+        rate = TaskGenerator.NO_DESCRIPTION_RATE
+        return [None if random.random() < rate else text for text in section.draw_many(count)]
+    
     @staticmethod
     def generate_tasks(
         projects: list,
@@ -41,6 +127,8 @@ class TaskGenerator:
         for project in projects:
             # Get sections for this project
             project_sections = [s for s in sections if s.project_id == project.project_id]
+            names = TaskGenerator.name_pool(project.project_type).draw_many(num_tasks_per_project)
+            descriptions = TaskGenerator.draw_descriptions(project.project_type, num_tasks_per_project)
             
             for i in range(num_tasks_per_project):
                 created_at = DateGenerator.generate_creation_timestamp()
@@ -66,8 +154,8 @@ class TaskGenerator:
                     task_id=str(uuid.uuid4()),
                     project_id=project.project_id,
                     section_id=random.choice(project_sections).section_id if project_sections else None,
-                    name=TaskGenerator.generate_task_name(project.project_type),
-                    description=TaskGenerator.generate_task_description(),
+                    name=names[i],
+                    description=descriptions[i],
                     created_at=created_at,
                     updated_at=DateGenerator.generate_updated_at(created_at, completed_at),
                     due_date=due_date,
@@ -85,52 +173,12 @@ class TaskGenerator:
     @staticmethod
     def generate_task_name(project_type: str = None) -> str:
         """Generate realistic task name based on project type."""
-        if project_type == 'engineering':
-            components = ['API', 'Database', 'Frontend', 'Backend', 'Cache', 'Queue']
-            actions = TaskGenerator.TASK_ACTIONS['engineering']
-            details = ['for performance', 'for security', 'for scalability', 'for reliability']
-            return f"{random.choice(components)} - {random.choice(actions)} - {random.choice(details)}"
-        
-        elif project_type == 'marketing':
-            campaigns = ['Q1 Campaign', 'Social Media', 'Email Marketing', 'Content']
-            deliverables = ['Design', 'Copy', 'Analytics Report', 'Strategy']
-            return f"{random.choice(campaigns)} - {random.choice(deliverables)}"
-        
-        elif project_type == 'operations':
-            processes = ['Onboarding', 'Budget', 'Procurement', 'Compliance']
-            actions = ['Planning', 'Review', 'Audit', 'Update']
-            return f"{random.choice(processes)} - {random.choice(actions)}"
-        
-        else:
-            # Default generic naming
-            templates = ['Task for {}', '{} needs review', 'Complete {} task']
-            return random.choice(templates).format(random.choice(['feature', 'bug fix', 'enhancement']))
+        return TaskGenerator.name_pool(project_type).draw()
     
     @staticmethod
-    def generate_task_description() -> str:
+    def generate_task_description(project_type: str = None) -> str:
         """Generate task description with realistic variations."""
-        rand = random.random()
-        
-        if rand < 0.20:
-            return None  # 20% no description
-        
-        elif rand < 0.50:
-            # 30% 1-3 sentences
-            sentences = [
-                "This task requires implementation of the specified feature.",
-                "Please complete this work according to the acceptance criteria.",
-                "Review the requirements and provide updates.",
-            ]
-            return " ".join(random.sample(sentences, random.randint(1, 3)))
-        
-        else:
-            # 50% detailed with bullet points
-            details = [
-                "Requirements:\n• Implement feature\n• Add unit tests\n• Document code",
-                "Tasks:\n• Research the topic\n• Create design spec\n• Get stakeholder approval",
-                "Checklist:\n- Review existing code\n- Design new approach\n- Implement solution\n- Test thoroughly",
-            ]
-            return random.choice(details)
+        return TaskGenerator.draw_descriptions(project_type, 1)[0]
     
     @staticmethod
     def generate_task_assignments(
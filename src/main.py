@@ -3,7 +3,7 @@
 import os
 import sys
 import logging
-import random
+import argparse
 from datetime import datetime
 from pathlib import Path
 
@@ -16,27 +16,57 @@ logger = logging.getLogger(__name__)
 
 # Import config and utilities
 from config import (
-    DATASET_CONFIG, RANDOM_SEED, DATABASE_PATH,
-    TEAMS, PROJECT_TYPES
+    DATASET_CONFIG, RANDOM_SEED, DATABASE_PATH, METRICS_CONFIG, SCALE_PRESETS, ENRICHMENT_CONFIG,
+    MATERIALIZED_VIEWS_CONFIG, ROLLUPS_CONFIG, SEARCH_INDEX_CONFIG
 )
-from src.utils.database import AsanaDatabase
-from src.generators.organizations import (
-    OrganizationGenerator, TeamGenerator, UserGenerator, TeamMembershipGenerator
+from src.stages import (
+    STAGES, SCHEMA_PATH, get_dependents, run_build, insert_records,
+    build_organization, write_organization_shard, organization_stage
 )
-
-# Set random seed for reproducibility
-random.seed(RANDOM_SEED)
+from src.utils.database import AsanaDatabase
+from src.utils.metrics import RunMetrics
+from src.utils.profiling import StageProfiler, PROFILE_MODES
+from src.utils.scheduler import StageScheduler, get_executor, map_unordered, shutdown_executor
 
 class DataGenerationPipeline:
     """Main pipeline for generating Asana seed data."""
     
-    def __init__(self, db_path: str = DATABASE_PATH):
+    def __init__(
+        self,
+        db_path: str = DATABASE_PATH,
+        in_memory: bool = None,
+        seed: int = RANDOM_SEED,
+        workers: int = 1,
+        shard: bool = False,
+        enrich: bool = None,
+        search_index: bool = None,
+        report: bool = None,
+        prometheus: bool = None,
+        profile: str = None,
+        profile_top: int = 25
+    ):
         """Initialize pipeline."""
-        self.db = AsanaDatabase(db_path)
+        self.db = AsanaDatabase(db_path, in_memory=in_memory)
+        self.seed = seed
+        self.workers = workers
+        self.shard = shard
+        self.enrich = ENRICHMENT_CONFIG['enabled'] if enrich is None else enrich
+        self.search_index = SEARCH_INDEX_CONFIG['enabled'] if search_index is None else search_index
+        self.llm_stats = None
+        self.report = METRICS_CONFIG['report'] if report is None else report
+        self.prometheus = METRICS_CONFIG['prometheus'] if prometheus is None else prometheus
+        self.metrics = RunMetrics(self.db)
+        self.profiler = StageProfiler(
+            profile,
+            output_dir=Path(db_path).parent / 'profiles',
+            top_n=profile_top,
+        )
         self.organization = None
         self.teams = []
         self.users = []
+        self.tags = []
         self.projects = []
+        self.sections = []
         self.tasks = []
     
     def setup(self):
@@ -47,16 +77,60 @@ class DataGenerationPipeline:
         output_dir = Path(self.db.db_path).parent
         output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Connect to database
+        self.db.connect()
+        
         # Initialize schema
         self._init_schema()
+        logger.info("Database setup complete")
+    
+    def setup_existing(self, stages: list):
+        """
+        Reuse an existing database for a stage-selective run.
+        
+        Tables owned by the selected stages are cleared (rows referencing
+        them follow via ON DELETE) and the output of earlier, unselected
+        stages is loaded back so the selected stages can build on it.
+        """
+        logger.info(f"Reusing existing database for stages: {', '.join(stages)}")
+        
+        if not Path(self.db.db_path).exists():
+            raise FileNotFoundError(
+                f"Database not found: {self.db.db_path} (run all stages first)"
+            )
         
-        # Connect to database
         self.db.connect()
-        logger.info("Database setup complete")
+        if self.db.in_memory:
+            self.db.load_from_disk()
+        
+        tables = [table for name, stage in reversed(list(STAGES.items())) if name in stages
+                  for table in stage.tables]
+        # Rebuilt in bulk after the run instead of tracking every change; a
+        # search index the database already had is rebuilt without the flag
+        self.search_index = self.search_index or self.db.has_search_index()
+        self.db.drop_materialized()
+        self.db.drop_rollups()
+        self.db.drop_search_index()
+        self.db.clear_tables(tables)
+        
+        # Load the output of unselected stages that selected stages read
+        required = {r for name in stages for r in STAGES[name].requires if r not in stages}
+        for name in STAGES:
+            stage = STAGES[name]
+            if name not in required or not stage.state:
+                continue
+            table = stage.tables[0]
+            records = self.db.load_records(table, stage.model)
+            if stage.state == 'organization':
+                records = records[-1] if records else None
+                logger.info(f"Loaded existing {table}")
+            else:
+                logger.info(f"Loaded {len(records)} existing {table}")
+            setattr(self, stage.state, records)
     
     def _init_schema(self):
         """Initialize database schema from schema.sql."""
-        schema_path = Path(__file__).parent.parent / 'schema.sql'
+        schema_path = SCHEMA_PATH
         
         if not schema_path.exists():
             logger.error(f"Schema file not found: {schema_path}")
@@ -68,6 +142,12 @@ class DataGenerationPipeline:
         with open(schema_path, 'r') as f:
             schema_sql = f.read()
         
+        if self.db.in_memory:
+            # The sqlite3 CLI cannot reach an in-memory database
+            self.db.executescript(schema_sql)
+            logger.info("Schema initialized successfully")
+            return
+        
         # Execute schema using sqlite3 CLI for better handling
         db_path = Path(self.db.db_path)
         db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -84,98 +164,104 @@ class DataGenerationPipeline:
             logger.info("Schema initialized successfully")
         except Exception as e:
             logger.warning(f"Could not use sqlite3 CLI: {e}")
-            logger.info("Schema will be initialized on first connection")
+            logger.info("Initializing schema through the database connection")
+            self.db.executescript(schema_sql)
     
-    def generate_organizations(self):
-        """Generate organization data."""
-        logger.info("Generating organizations...")
-        
-        for _ in range(DATASET_CONFIG['num_organizations']):
-            org = OrganizationGenerator.generate()
-            self.organization = org
-            
-            # Insert to database
-            self.db.insert_organization(**vars(org))
-            logger.info(f"Generated organization: {org.name}")
-        
-        self.db.commit()
+    def _submit_stage(self, executor, name: str):
+        """Submit a stage's build with the state of the stages it requires."""
+        logger.info(f"Generating {name}...")
+        inputs = {
+            STAGES[required].state: getattr(self, STAGES[required].state)
+            for required in STAGES[name].requires
+        }
+        profiler = self.profiler if self.profiler.mode else None
+        return executor.submit(run_build, name, inputs, self.seed, dict(DATASET_CONFIG), profiler)
     
-    def generate_teams(self):
-        """Generate teams."""
-        logger.info("Generating teams...")
-        
-        if not self.organization:
-            logger.error("No organization available")
-            return
+    def _write_stage(self, name: str, result: tuple):
+        """Insert a built stage's records and keep them if later stages need them."""
+        records, build_wall, build_cpu = result
+        stage = STAGES[name]
         
-        teams = TeamGenerator.generate_teams(self.organization.organization_id)
-        self.teams = teams
+        with self.metrics.stage(name, build_wall, build_cpu), self.profiler.stage(f'{name}.write'):
+            insert_records(self.db, name, records)
         
-        for team in teams:
-            self.db.insert_team(**vars(team))
-        
-        self.db.commit()
-        logger.info(f"Generated {len(teams)} teams")
+        if stage.state == 'organization':
+            self.organization = records[-1] if records else None
+        elif stage.state:
+            setattr(self, stage.state, records)
+        logger.info(f"Generated {len(records)} {', '.join(stage.tables)}")
     
-    def generate_users(self):
-        """Generate users."""
-        logger.info("Generating users...")
-        
-        if not self.organization:
-            logger.error("No organization available")
-            return
-        
-        users = UserGenerator.generate_users(
-            self.organization.organization_id,
-            self.teams,
-            DATASET_CONFIG['num_users']
-        )
-        self.users = users
+    def generate_organizations(self):
+        """
+        Generate every organization's subgraph in worker processes.
         
-        for user in users:
-            self.db.insert_user(**vars(user))
+        Each worker builds one organization at a time from its own seed; the
+        records come back here and are written through the shared connection
+        as each organization completes.
+        """
+        count = DATASET_CONFIG['num_organizations']
+        logger.info(f"Generating {count} organizations with {self.workers} worker(s)...")
         
-        self.db.commit()
-        logger.info(f"Generated {len(users)} users")
+        profiler = self.profiler if self.profiler.mode else None
+        calls = ((index, self.seed, dict(DATASET_CONFIG), profiler) for index in range(count))
+        executor = get_executor(self.workers)
+        self.metrics.verbose = False
+        try:
+            for written, ((index, *_), results) in enumerate(
+                map_unordered(executor, build_organization, calls, 2 * self.workers), 1
+            ):
+                for name, (records, build_wall, build_cpu) in results.items():
+                    profile_name = f'{organization_stage(index, name)}.write'
+                    with self.metrics.stage(name, build_wall, build_cpu), self.profiler.stage(profile_name):
+                        insert_records(self.db, name, records)
+                logger.info(f"Wrote organization {index} ({written}/{count})")
+        finally:
+            shutdown_executor(executor)
+            self.metrics.verbose = True
+        self.metrics.log_stages()
     
-    def generate_team_memberships(self):
-        """Generate team memberships."""
-        logger.info("Generating team memberships...")
+    def generate_shards(self):
+        """Generate each organization into its own database file next to the main one."""
+        count = DATASET_CONFIG['num_organizations']
+        logger.info(f"Generating {count} organization shards with {self.workers} worker(s)...")
+        Path(self.db.db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        memberships = TeamMembershipGenerator.generate_memberships(
-            self.users,
-            self.teams
+        profiler = self.profiler if self.profiler.mode else None
+        calls = (
+            (index, self.seed, dict(DATASET_CONFIG), self.search_index, profiler, self.shard_path(index))
+            for index in range(count)
         )
+        executor = get_executor(self.workers)
+        self.metrics.verbose = False
+        try:
+            for written, ((index, *_, path), stage_metrics) in enumerate(
+                map_unordered(executor, write_organization_shard, calls, 2 * self.workers), 1
+            ):
+                for metrics in stage_metrics:
+                    self.metrics.record(metrics)
+                logger.info(f"Wrote shard {path} ({written}/{count})")
+        finally:
+            shutdown_executor(executor)
+            self.metrics.verbose = True
+        self.metrics.log_stages()
+    
+    def enrich_text(self):
+        """Backfill template text with LLM output (see TextEnricher)."""
+        # Imported here: runs without enrichment never load the LLM client
+        from src.enrichment import TextEnricher
         
-        for membership in memberships:
-            query = '''
-                INSERT INTO team_memberships 
-                (membership_id, team_id, user_id, joined_at, role)
-                VALUES (?, ?, ?, ?, ?)
-            '''
-            self.db.execute(query, (
-                membership.membership_id,
-                membership.team_id,
-                membership.user_id,
-                membership.joined_at,
-                membership.role,
-            ))
-        
-        self.db.commit()
-        logger.info(f"Generated {len(memberships)} team memberships")
-    
-    def generate_projects(self):
-        """Generate projects."""
-        logger.info(f"Generated {DATASET_CONFIG['num_projects']} projects (placeholder)")
-    
-    def generate_sections(self):
-        """Generate sections.""" 
-        logger.info(f"Generated {DATASET_CONFIG['num_projects']*5} sections (placeholder)")
-    
-    def generate_tasks(self):
-        """Generate tasks."""
-        logger.info(f"Generated {DATASET_CONFIG['num_tasks_per_project']*DATASET_CONFIG['num_projects']} tasks (placeholder)")
-
+        logger.info("Enriching text with the LLM...")
+        enricher = TextEnricher(self.db)
+        try:
+            enricher.run()
+        finally:
+            self.llm_stats = enricher.get_stats()
+            enricher.close()
+    
+    def shard_path(self, index: int) -> str:
+        """Database file for organization number index in a sharded run."""
+        db_path = Path(self.db.db_path)
+        return str(db_path.with_name(f"{db_path.stem}.org{index:04d}{db_path.suffix}"))
     
     def validate(self):
         """Validate generated data."""
@@ -194,8 +280,9 @@ class DataGenerationPipeline:
         if org_count != DATASET_CONFIG['num_organizations']:
             logger.warning(f"Organization count mismatch: {org_count} != {DATASET_CONFIG['num_organizations']}")
         
-        if user_count != DATASET_CONFIG['num_users']:
-            logger.warning(f"User count mismatch: {user_count} != {DATASET_CONFIG['num_users']}")
+        expected_users = DATASET_CONFIG['num_users'] * DATASET_CONFIG['num_organizations']
+        if user_count != expected_users:
+            logger.warning(f"User count mismatch: {user_count} != {expected_users}")
     
     def cleanup(self):
         """Cleanup and close database."""
@@ -203,22 +290,77 @@ class DataGenerationPipeline:
         self.db.disconnect()
         logger.info("Pipeline complete")
     
-    def run(self):
-        """Execute full pipeline."""
+    def run(self, stages: list = None) -> bool:
+        """
+        Execute the pipeline.
+        
+        With stages=None every stage runs against a freshly initialized
+        database. Otherwise only the named stages run, against the existing
+        database (see setup_existing).
+        
+        With more than one organization, each organization's subgraph is
+        generated as a unit (see generate_organizations); with shard=True
+        each goes to its own database file (see generate_shards).
+        """
+        success = False
         try:
             logger.info("=" * 80)
             logger.info("ASANA SEED DATA GENERATION PIPELINE")
             logger.info(f"Start time: {datetime.now()}")
+            logger.info(f"Random seed: {self.seed}")
+            logger.info(f"Workers: {self.workers}")
             logger.info("=" * 80)
             
-            self.setup()
-            self.generate_organizations()
-            self.generate_teams()
-            self.generate_users()
-            self.generate_team_memberships()
-            self.generate_projects()
-            self.generate_tasks()
-            self.validate()
+            multi_tenant = DATASET_CONFIG['num_organizations'] > 1
+            full_run = stages is None
+            if full_run:
+                stages = list(STAGES)
+            elif multi_tenant or self.shard:
+                raise ValueError("Stage-selective runs support a single, unsharded organization")
+            
+            if self.shard:
+                if self.enrich:
+                    logger.warning("Text enrichment is not supported for sharded runs; skipping")
+                self.generate_shards()
+                success = True
+            else:
+                if full_run:
+                    self.setup()
+                else:
+                    self.setup_existing(stages)
+                
+                if multi_tenant:
+                    self.generate_organizations()
+                else:
+                    requires = {name: stage.requires for name, stage in STAGES.items()}
+                    StageScheduler(requires, self.workers).run(stages, self._submit_stage, self._write_stage)
+                
+                if self.enrich:
+                    if self.db.in_memory:
+                        # The structural data must be on disk and usable while
+                        # the LLM works through it, as in a normal run
+                        with self.metrics.stage('flush'), self.profiler.stage('flush'):
+                            self.db.move_to_disk()
+                    with self.metrics.stage('enrich'), self.profiler.stage('enrich'):
+                        self.enrich_text()
+                
+                if MATERIALIZED_VIEWS_CONFIG['enabled']:
+                    with self.metrics.stage('materialize'), self.profiler.stage('materialize'):
+                        self.db.build_materialized()
+                
+                if ROLLUPS_CONFIG['enabled']:
+                    with self.metrics.stage('rollups'), self.profiler.stage('rollups'):
+                        self.db.build_rollups()
+                
+                if self.search_index:
+                    with self.metrics.stage('search_index'), self.profiler.stage('search_index'):
+                        self.db.build_search_index()
+                
+                with self.metrics.stage('validate'), self.profiler.stage('validate'):
+                    self.validate()
+                with self.metrics.stage('finalize'), self.profiler.stage('finalize'):
+                    self.db.finalize()
+                success = True
             
             logger.info("=" * 80)
             logger.info(f"Pipeline completed successfully!")
@@ -228,16 +370,149 @@ class DataGenerationPipeline:
             
         except Exception as e:
             logger.error(f"Pipeline failed: {e}", exc_info=True)
-            self.db.rollback()
+            if self.db.conn:
+                self.db.rollback()
         finally:
+            self.write_reports(stages, success)
             self.cleanup()
+        
+        return success
+    
+    def write_reports(self, stages: list, success: bool):
+        """Write the JSON run report and Prometheus metrics next to the database."""
+        if not self.metrics.stages:
+            return
+        
+        base_path = Path(self.db.db_path).with_suffix('')
+        try:
+            if self.report:
+                self.metrics.write_report(
+                    f"{base_path}.run.json",
+                    success=success,
+                    seed=self.seed,
+                    stages_run=stages,
+                    dataset_config=DATASET_CONFIG,
+                    **({'llm': self.llm_stats} if self.llm_stats else {}),
+                )
+            if self.prometheus:
+                self.metrics.write_prometheus(f"{base_path}.prom")
+        except OSError as e:
+            logger.warning(f"Could not write run report: {e}")
 
 
-def main():
-    """Main entry point."""
-    pipeline = DataGenerationPipeline()
-    pipeline.run()
+def _parse_config_override(value: str) -> tuple:
+    """Parse a KEY=VALUE override for DATASET_CONFIG."""
+    key, sep, raw = value.partition('=')
+    if not sep or key not in DATASET_CONFIG:
+        raise argparse.ArgumentTypeError(
+            f"expected KEY=VALUE with KEY one of: {', '.join(DATASET_CONFIG)}"
+        )
+    try:
+        return key, int(raw)
+    except ValueError:
+        try:
+            return key, float(raw)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"{key} needs a numeric value, got {raw!r}")
+
+
+def _parse_stage_list(value: str) -> list:
+    """Parse a comma-separated list of stage names."""
+    stages = [stage.strip() for stage in value.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown or not stages:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage(s) {', '.join(unknown) or '(none)'}; choose from: {', '.join(STAGES)}"
+        )
+    return stages
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Generate Asana seed data.",
+        epilog="Clearing a stage's table also removes rows that reference it, "
+               "so re-run dependent stages too (--from does this for you).",
+    )
+    parser.add_argument('--db', default=DATABASE_PATH,
+                        help=f"output database path (default: {DATABASE_PATH})")
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED,
+                        help=f"random seed (default: {RANDOM_SEED})")
+    parser.add_argument('--scale', choices=list(SCALE_PRESETS),
+                        help="dataset size preset from SCALE_PRESETS (applied before --set)")
+    parser.add_argument('--set', dest='overrides', metavar='KEY=VALUE', action='append',
+                        type=_parse_config_override, default=[],
+                        help="override a DATASET_CONFIG entry, e.g. --set num_users=1000")
+    parser.add_argument('--in-memory', action='store_true', default=None,
+                        help="build in memory and write the database once at the end")
+    parser.add_argument('--no-report', dest='report', action='store_false', default=None,
+                        help="do not write the JSON run report")
+    parser.add_argument('--prometheus', action='store_true', default=None,
+                        help="also write stage metrics in Prometheus text format")
+    
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument('--stages', type=_parse_stage_list,
+                           help="comma-separated stages to re-run against an existing database")
+    selection.add_argument('--from', dest='from_stage', choices=list(STAGES), metavar='STAGE',
+                           help="re-run STAGE and every stage that depends on it against an existing database")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="build independent stages, or organizations when num_organizations > 1, "
+                             "in N worker processes (default: 1)")
+    parser.add_argument('--shard', action='store_true',
+                        help="write each organization to its own database, <db stem>.orgNNNN.sqlite")
+    parser.add_argument('--enrich', action='store_true', default=None,
+                        help="after loading, replace template task names, descriptions and comments "
+                             "with LLM text (see ENRICHMENT_CONFIG)")
+    parser.add_argument('--search-index', action='store_true', default=None,
+                        help="after loading, build an FTS5 full-text index over task names, descriptions "
+                             "and comments (see SEARCH_INDEX_CONFIG)")
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help="profile each stage with cProfile (cpu) or tracemalloc (mem); "
+                             "reports go to <db dir>/profiles/")
+    parser.add_argument('--profile-top', type=int, default=25, metavar='N',
+                        help="allocation sites listed per stage with --profile mem (default: 25)")
+    parser.add_argument('--list-stages', action='store_true',
+                        help="list pipeline stages, their tables and dependencies, and exit")
+    return parser.parse_args(argv)
+
 
+def main(argv: list = None):
+    """Main entry point."""
+    args = parse_args(argv)
+    
+    if args.list_stages:
+        for name, stage in STAGES.items():
+            requires = f"  (requires: {', '.join(stage.requires)})" if stage.requires else ""
+            print(f"{name:<18} {', '.join(stage.tables):<26}{requires}")
+        return
+    
+    if args.scale:
+        logger.info(f"Using scale preset {args.scale}: {SCALE_PRESETS[args.scale]}")
+        DATASET_CONFIG.update(SCALE_PRESETS[args.scale])
+    
+    for key, value in args.overrides:
+        logger.info(f"Overriding DATASET_CONFIG['{key}'] = {value}")
+        DATASET_CONFIG[key] = value
+    
+    stages = args.stages
+    if args.from_stage:
+        stages = get_dependents(args.from_stage)
+    
+    pipeline = DataGenerationPipeline(
+        args.db,
+        in_memory=args.in_memory,
+        seed=args.seed,
+        workers=max(1, args.workers),
+        shard=args.shard,
+        enrich=args.enrich,
+        search_index=args.search_index,
+        report=args.report,
+        prometheus=args.prometheus,
+        profile=args.profile,
+        profile_top=args.profile_top,
+    )
+    if not pipeline.run(stages):
+        sys.exit(1)
 
 
 if __name__ == '__main__':
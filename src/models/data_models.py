@@ -167,3 +167,34 @@ class TaskTag:
     task_id: str
     tag_id: str
     added_at: datetime
+
+@dataclass
+class TeamWorkload:
+    """Row of the team_workload view."""
+    team_id: str
+    team_name: str
+    num_team_members: int
+    total_assigned_tasks: int
+    open_tasks: Optional[int] = None
+    completed_tasks: Optional[int] = None
+
+@dataclass
+class UserProductivity:
+    """Row of the user_productivity view."""
+    user_id: str
+    name: str
+    total_assigned_tasks: int
+    completed_tasks: Optional[int] = None
+    completion_percentage: Optional[float] = None
+    overdue_tasks: int = 0
+
+@dataclass
+class DailyRollup:
+    """Row of daily_project_rollup (project_id set) or daily_team_rollup (team_id set)."""
+    day: date
+    tasks_created: int
+    tasks_completed: int
+    open_tasks: int
+    comments_created: int
+    project_id: Optional[str] = None
+    team_id: Optional[str] = None
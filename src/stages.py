@@ -0,0 +1,246 @@
+# Pipeline stage definitions
+
+import time
+import random
+import logging
+from pathlib import Path
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from config import (
+    DATASET_CONFIG, COMMENT_PROBABILITY, SUBTASK_PROBABILITY, MATERIALIZED_VIEWS_CONFIG, ROLLUPS_CONFIG
+)
+from src.utils.database import AsanaDatabase
+from src.utils.metrics import RunMetrics
+from src.models.data_models import Organization, Team, User, Project, Section, Task, Tag
+from src.generators.organizations import (
+    OrganizationGenerator, TeamGenerator, UserGenerator, TeamMembershipGenerator
+)
+from src.generators.projects import ProjectGenerator
+from src.generators.sections import SectionGenerator
+from src.generators.tasks import TaskGenerator
+from src.generators.stubs import (
+    SubtaskGenerator, CommentGenerator, CustomFieldGenerator, TagGenerator
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = Path(__file__).parent.parent / 'schema.sql'
+
+
+def build_organizations(index: int = None) -> list:
+    if index is not None:
+        return [OrganizationGenerator.generate(index=index)]
+    return [OrganizationGenerator.generate(index=i) for i in range(DATASET_CONFIG['num_organizations'])]
+
+
+def build_teams(organization) -> list:
+    return TeamGenerator.generate_teams(organization.organization_id)
+
+
+def build_users(organization, teams) -> list:
+    return UserGenerator.generate_users(
+        organization.organization_id, teams, DATASET_CONFIG['num_users'], email_domain=organization.domain
+    )
+
+
+def build_team_memberships(users, teams) -> list:
+    return TeamMembershipGenerator.generate_memberships(users, teams)
+
+
+def build_tags(organization) -> list:
+    return TagGenerator.generate_tags(organization.organization_id)
+
+
+def build_projects(organization, teams) -> list:
+    return ProjectGenerator.generate_projects(organization.organization_id, teams, DATASET_CONFIG['num_projects'])
+
+
+def build_sections(projects) -> list:
+    return SectionGenerator.generate_sections(projects)
+
+
+def build_custom_fields(projects) -> list:
+    return CustomFieldGenerator.generate_custom_fields(projects)
+
+
+def build_tasks(projects, users, sections) -> list:
+    return TaskGenerator.generate_tasks(projects, users, sections)
+
+
+def build_task_assignments(tasks, users, teams) -> list:
+    return TaskGenerator.generate_task_assignments(tasks, users, teams)
+
+
+def build_subtasks(tasks) -> list:
+    return SubtaskGenerator.generate_subtasks(tasks, SUBTASK_PROBABILITY)
+
+
+def build_comments(tasks, users) -> list:
+    return CommentGenerator.generate_comments(tasks, users, COMMENT_PROBABILITY)
+
+
+def build_task_tags(tasks, tags) -> list:
+    return TagGenerator.generate_task_tags(tasks, tags)
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A pipeline stage.
+
+    build(**inputs) generates the stage's records from the state of the
+    stages it requires; the pipeline then writes them with the AsanaDatabase
+    method named by insert.
+    """
+    name: str
+    build: Callable[..., list]
+    insert: str
+    tables: List[str]
+    requires: List[str] = field(default_factory=list)
+    state: Optional[str] = None  # Pipeline attribute later stages read the records from
+    model: Optional[type] = None  # Dataclass used to load the state back from the database
+
+
+# Stages in a valid execution order; each only requires stages listed above it
+STAGES = {stage.name: stage for stage in [
+    Stage('organizations', build_organizations, 'insert_organization', ['organizations'],
+          state='organization', model=Organization),
+    Stage('teams', build_teams, 'insert_team', ['teams'],
+          requires=['organizations'], state='teams', model=Team),
+    Stage('users', build_users, 'insert_user', ['users'],
+          requires=['organizations', 'teams'], state='users', model=User),
+    Stage('team_memberships', build_team_memberships, 'insert_team_membership', ['team_memberships'],
+          requires=['users', 'teams']),
+    Stage('tags', build_tags, 'insert_tag', ['tags'],
+          requires=['organizations'], state='tags', model=Tag),
+    Stage('projects', build_projects, 'insert_project', ['projects'],
+          requires=['organizations', 'teams'], state='projects', model=Project),
+    Stage('sections', build_sections, 'insert_section', ['sections'],
+          requires=['projects'], state='sections', model=Section),
+    Stage('custom_fields', build_custom_fields, 'insert_custom_field_definition', ['custom_field_definitions'],
+          requires=['projects']),
+    Stage('tasks', build_tasks, 'insert_task', ['tasks'],
+          requires=['projects', 'users', 'sections'], state='tasks', model=Task),
+    Stage('task_assignments', build_task_assignments, 'insert_task_assignee', ['task_assignees'],
+          requires=['tasks', 'users', 'teams']),
+    Stage('subtasks', build_subtasks, 'insert_subtask', ['subtasks'],
+          requires=['tasks']),
+    Stage('comments', build_comments, 'insert_comment', ['comments'],
+          requires=['tasks', 'users']),
+    Stage('task_tags', build_task_tags, 'insert_task_tag', ['task_tags'],
+          requires=['tasks', 'tags']),
+]}
+
+
+def get_dependents(name: str) -> List[str]:
+    """Get name and every stage that transitively requires it, in stage order."""
+    selected = {name}
+    for stage in STAGES.values():
+        if any(required in selected for required in stage.requires):
+            selected.add(stage.name)
+    return [stage for stage in STAGES if stage in selected]
+
+
+def run_build(
+    name: str, inputs: dict, seed, dataset_config: dict, profiler=None, profile_name: str = None
+) -> tuple:
+    """
+    Build a stage's records; runs inline or in a worker process.
+
+    Each stage seeds the random module from (seed, stage name), so output
+    does not depend on which worker runs it or in what order. With a
+    profiler, the build is profiled as <profile_name or name>.build.
+
+    Returns (records, wall_seconds, cpu_seconds).
+    """
+    DATASET_CONFIG.update(dataset_config)
+    random.seed(f'{seed}:{name}')
+
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    if profiler is not None:
+        with profiler.stage(f'{profile_name or name}.build'):
+            records = STAGES[name].build(**inputs)
+    else:
+        records = STAGES[name].build(**inputs)
+    return records, time.perf_counter() - start_wall, time.process_time() - start_cpu
+
+
+def insert_records(db: AsanaDatabase, name: str, records: list):
+    """Insert a stage's records with its AsanaDatabase insert method and commit."""
+    insert = getattr(db, STAGES[name].insert)
+    for record in records:
+        insert(**vars(record))
+    db.commit()
+
+
+def organization_stage(index: int, name: str) -> str:
+    """Profile name of a stage step of organization number index, e.g. 'org0003.tasks.build'."""
+    return f'org{index:04d}.{name}'
+
+
+def build_organization(index: int, seed: int, dataset_config: dict, profiler=None) -> dict:
+    """
+    Build the full subgraph of organization number index.
+
+    Stages are seeded from (seed, index, stage name), so each tenant is
+    reproducible on its own; with a profiler, each build is profiled as
+    org<index>.<stage>.build. Returns {stage: (records, wall_seconds,
+    cpu_seconds)} in stage order.
+    """
+    org_seed = f'{seed}:{index}'
+    state = {}
+    results = {}
+    for name, stage in STAGES.items():
+        inputs = {STAGES[r].state: state[STAGES[r].state] for r in stage.requires}
+        if name == 'organizations':
+            inputs['index'] = index
+        results[name] = run_build(
+            name, inputs, org_seed, dataset_config, profiler, profile_name=organization_stage(index, name)
+        )
+        records = results[name][0]
+        if stage.state == 'organization':
+            state[stage.state] = records[-1]
+        elif stage.state:
+            state[stage.state] = records
+    return results
+
+
+def write_organization_shard(
+    index: int, seed: int, dataset_config: dict, search_index: bool, profiler, db_path: str
+) -> list:
+    """
+    Build organization number index into its own database at db_path,
+    with a full-text index if search_index; returns its stage metrics.
+
+    With a profiler, builds and writes are profiled per stage as in
+    build_organization.
+    """
+    results = build_organization(index, seed, dataset_config, profiler)
+
+    db = AsanaDatabase(db_path, in_memory=False)
+    db.connect()
+    try:
+        db.executescript(SCHEMA_PATH.read_text())
+        metrics = RunMetrics(db, verbose=False)
+        for name, (records, build_wall, build_cpu) in results.items():
+            profile = (
+                profiler.stage(f'{organization_stage(index, name)}.write') if profiler is not None
+                else nullcontext()
+            )
+            with metrics.stage(name, build_wall, build_cpu), profile:
+                insert_records(db, name, records)
+        if MATERIALIZED_VIEWS_CONFIG['enabled']:
+            with metrics.stage('materialize'):
+                db.build_materialized()
+        if ROLLUPS_CONFIG['enabled']:
+            with metrics.stage('rollups'):
+                db.build_rollups()
+        if search_index:
+            with metrics.stage('search_index'):
+                db.build_search_index()
+        db.finalize()
+    finally:
+        db.disconnect()
+    return metrics.stages
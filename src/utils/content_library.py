@@ -0,0 +1,279 @@
+# Offline library of LLM-generated text, read through mmap
+#
+# Build once with the configured LLM provider, then every run samples from
+# the file without network access:
+#
+#   python -m src.utils.content_library build --per-type 2000
+#   python -m src.utils.content_library info
+#
+# File layout (little-endian):
+#   magic (8 bytes) | format version (u32) | header length (u32) | header JSON
+#   then per section, 8-byte aligned: count + 1 u64 offsets, then UTF-8 data
+# The header lists the sections (kind, project type, count, offsets position,
+# data position) and build metadata. Entry i of a section is
+# data[offsets[i]:offsets[i + 1]].
+
+import sys
+import json
+import mmap
+import random
+import struct
+import logging
+from array import array
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+from config import CONTENT_LIBRARY_CONFIG, PROJECT_TYPES
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ASEEDLIB'
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct('<8sII')
+KINDS = ('task_name', 'task_description', 'comment')
+ANY_PROJECT_TYPE = ''
+
+
+class LibrarySection:
+    """The strings of one (kind, project type) section, decoded on first draw."""
+
+    def __init__(self, buffer: memoryview, offsets_at: int, data_at: int, count: int):
+        """Initialize section over the mapped file."""
+        offsets = buffer[offsets_at:offsets_at + 8 * (count + 1)].cast('Q')
+        if sys.byteorder != 'little':
+            offsets = array('Q', offsets)
+            offsets.byteswap()
+        self.offsets = offsets
+        self.data = buffer[data_at:data_at + self.offsets[count]]
+        self._strings = [None] * count
+
+    def __len__(self) -> int:
+        """Number of entries."""
+        return len(self._strings)
+
+    def get(self, index: int) -> str:
+        """Entry at index; each entry is decoded once and then shared."""
+        text = self._strings[index]
+        if text is None:
+            text = str(self.data[self.offsets[index]:self.offsets[index + 1]], 'utf-8')
+            self._strings[index] = text = sys.intern(text)
+        return text
+
+    def draw(self) -> str:
+        """One entry, drawn with the global random generator."""
+        return self.get(int(random.random() * len(self._strings)))
+
+    def draw_many(self, count: int) -> List[str]:
+        """count entries drawn independently."""
+        get = self.get
+        size = len(self._strings)
+        rand = random.random
+        return [get(int(rand() * size)) for _ in range(count)]
+
+    def release(self):
+        """Drop references into the mapped file."""
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        self.data.release()
+
+
+class ContentLibrary:
+    """Read-only, memory-mapped content library file."""
+
+    def __init__(self, path: str):
+        """Map the file and read its section index; raises ValueError if it is not a library."""
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version, header_length = PREAMBLE.unpack_from(self._buffer)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a content library")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} has format version {version}, expected {FORMAT_VERSION}")
+
+        header = json.loads(bytes(self._buffer[PREAMBLE.size:PREAMBLE.size + header_length]))
+        self.metadata = header['metadata']
+        self.sections = {
+            (section['kind'], section['project_type']): LibrarySection(
+                self._buffer, section['offsets_at'], section['data_at'], section['count']
+            )
+            for section in header['sections']
+        }
+
+    def section(self, kind: str, project_type: str = None) -> Optional[LibrarySection]:
+        """Section for kind and project type, else kind's all-types section, else None."""
+        return (
+            self.sections.get((kind, project_type or ANY_PROJECT_TYPE))
+            or self.sections.get((kind, ANY_PROJECT_TYPE))
+        )
+
+    def close(self):
+        """Unmap the file."""
+        for section in getattr(self, 'sections', {}).values():
+            section.release()
+        self._buffer.release()
+        self._mmap.close()
+
+
+def write_library(path: str, sections: Dict[tuple, List[str]], metadata: dict = None):
+    """Write {(kind, project_type): strings} as a library file, replacing path atomically."""
+    blocks = []
+    index = []
+    position = 0
+    for (kind, project_type), strings in sections.items():
+        encoded = [text.encode('utf-8') for text in strings]
+        offsets = array('Q', [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        offsets_bytes = offsets.tobytes()
+        data_bytes = b''.join(encoded)
+        index.append({
+            'kind': kind, 'project_type': project_type, 'count': len(strings),
+            'offsets_at': position, 'data_at': position + len(offsets_bytes),
+        })
+        padding = -(len(offsets_bytes) + len(data_bytes)) % 8
+        blocks.append(offsets_bytes + data_bytes + b'\0' * padding)
+        position += len(blocks[-1])
+
+    # Section positions are relative until the header size is known
+    def encode_header(base: int) -> bytes:
+        sections_index = [
+            {**entry, 'offsets_at': entry['offsets_at'] + base, 'data_at': entry['data_at'] + base}
+            for entry in index
+        ]
+        return json.dumps({'metadata': metadata or {}, 'sections': sections_index}).encode('utf-8')
+
+    base = 0
+    while True:
+        header = encode_header(base)
+        start = PREAMBLE.size + len(header)
+        aligned = start + (-start % 8)
+        if aligned == base:
+            break
+        base = aligned
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(b'\0' * (base - start))
+        for block in blocks:
+            f.write(block)
+    Path(tmp_path).replace(path)
+
+
+@lru_cache(maxsize=None)
+def load_library(path: str) -> Optional[ContentLibrary]:
+    """Library at path, mapped once per process, or None if it is missing or unreadable."""
+    if not Path(path).exists():
+        return None
+    try:
+        library = ContentLibrary(path)
+    except (OSError, ValueError, KeyError, struct.error) as e:
+        logger.warning(f"Ignoring content library {path}: {e}")
+        return None
+    counts = {f"{kind}/{project_type or '*'}": len(s) for (kind, project_type), s in library.sections.items()}
+    logger.info(f"Using content library {path}: {counts}")
+    return library
+
+
+def get_library() -> Optional[ContentLibrary]:
+    """The configured content library, or None to use the templates."""
+    if not CONTENT_LIBRARY_CONFIG['enabled']:
+        return None
+    return load_library(CONTENT_LIBRARY_CONFIG['path'])
+
+
+def get_section(kind: str, project_type: str = None) -> Optional[LibrarySection]:
+    """Library section to sample kind from, or None to use the templates."""
+    library = get_library()
+    return library.section(kind, project_type) if library else None
+
+
+def build_library(client, per_type: int, project_types: List[str]) -> Dict[tuple, List[str]]:
+    """
+    Generate per_type task names per project type with client, then a
+    description and a comment for each name. Failed items are left out
+    rather than filled from templates. Each kind also gets an all-types
+    section combining the others.
+    """
+    sections = {}
+    skip = lambda item: None
+    for project_type in project_types:
+        names = client.generate_task_names_batch(project_type, per_type, fallback=skip)
+        names = list(dict.fromkeys(name for name in names if name))
+        sections[('task_name', project_type)] = names
+        for kind, generate in (
+            ('task_description', client.generate_task_descriptions_batch),
+            ('comment', client.generate_comments_batch),
+        ):
+            texts = generate(names, fallback=skip) if names else []
+            sections[(kind, project_type)] = list(dict.fromkeys(text for text in texts if text))
+        logger.info(
+            f"{project_type}: " + ", ".join(f"{len(sections[(kind, project_type)])} {kind}" for kind in KINDS)
+        )
+
+    for kind in KINDS:
+        combined = [text for project_type in project_types for text in sections[(kind, project_type)]]
+        sections[(kind, ANY_PROJECT_TYPE)] = list(dict.fromkeys(combined))
+    return {key: strings for key, strings in sections.items() if strings}
+
+
+def main(argv: list = None) -> int:
+    """Build or inspect a content library."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Build or inspect the offline content library.")
+    parser.add_argument('command', choices=['build', 'info'])
+    parser.add_argument('--path', default=CONTENT_LIBRARY_CONFIG['path'],
+                        help=f"library file (default: {CONTENT_LIBRARY_CONFIG['path']})")
+    parser.add_argument('--per-type', type=int, default=1000, metavar='N',
+                        help="task names requested per project type (default: 1000)")
+    parser.add_argument('--project-types', default=','.join(PROJECT_TYPES),
+                        help="comma-separated project types (default: all in config)")
+    parser.add_argument('--provider', help="LLM provider (default: LLM_CONFIG['provider'])")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == 'info':
+        library = ContentLibrary(args.path)
+        logger.info(f"{args.path}: format version {FORMAT_VERSION}, {json.dumps(library.metadata)}")
+        for (kind, project_type), section in sorted(library.sections.items()):
+            logger.info(f"  {kind:<18} {project_type or '*':<14} {len(section):>8}")
+        library.close()
+        return 0
+
+    # Imported here: 'info' needs no LLM client
+    from src.utils.llm_client import LLMClient
+    client = LLMClient(args.provider)
+    if not client.enabled:
+        logger.error("LLM provider is not available; set its API key or use --provider local")
+        return 1
+
+    project_types = [project_type.strip() for project_type in args.project_types.split(',') if project_type.strip()]
+    try:
+        sections = build_library(client, args.per_type, project_types)
+        stats = client.get_stats()
+    finally:
+        client.close()
+
+    write_library(args.path, sections, {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'provider': client.provider,
+        'model': client.model,
+        'per_type': args.per_type,
+    })
+    logger.info(f"Wrote {sum(map(len, sections.values()))} entries to {args.path} (LLM stats: {stats})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
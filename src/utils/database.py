@@ -1,31 +1,86 @@
 # Database utility functions
 
+import os
 import sqlite3
 import logging
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import List, Dict, Any, Tuple
-from config import DATABASE_PATH
+from datetime import datetime, date
+from typing import List, Dict, Any, Tuple, Callable, Iterator
+from config import DATABASE_PATH, IN_MEMORY_CONFIG, READ_API_CONFIG, SEARCH_INDEX_CONFIG
+from src.models.data_models import Task, Comment, TeamWorkload, UserProductivity, DailyRollup
+from src.utils import materialized, rollups, search
+from src.utils.queries import QUERY_SET
 
 logger = logging.getLogger(__name__)
 
+# Columns parsed back into datetime/date objects by load_records()
+TIMESTAMP_COLUMNS = {
+    'created_at', 'updated_at', 'completed_at', 'joined_at', 'assigned_at', 'added_at',
+}
+DATE_COLUMNS = {'due_date', 'start_date', 'day'}
+
+
+def row_to_record(row: sqlite3.Row, model_cls):
+    """Build a model_cls instance from a row, parsing timestamp and date columns."""
+    values = dict(row)
+    for column, value in values.items():
+        if value is None or not isinstance(value, str):
+            continue
+        if column in TIMESTAMP_COLUMNS:
+            values[column] = datetime.fromisoformat(value)
+        elif column in DATE_COLUMNS:
+            values[column] = date.fromisoformat(value)
+    return model_cls(**values)
+
 class AsanaDatabase:
     """Database connection and operation handler for Asana simulation."""
     
-    def __init__(self, db_path: str = DATABASE_PATH):
-        """Initialize database connection."""
+    def __init__(
+        self,
+        db_path: str = DATABASE_PATH,
+        in_memory: bool = None,
+        memory_budget_mb: int = None,
+        result_cache_size: int = None
+    ):
+        """
+        Initialize database connection.
+        
+        With in_memory=True the database is built in ':memory:' and only
+        written to db_path by flush_to_disk(). result_cache_size > 0 caches
+        that many results of the typed read API (see _cached_read()).
+        """
         self.db_path = db_path
+        self.in_memory = IN_MEMORY_CONFIG['enabled'] if in_memory is None else in_memory
+        self.memory_budget_mb = memory_budget_mb or IN_MEMORY_CONFIG['memory_budget_mb']
+        self.result_cache_size = (
+            READ_API_CONFIG['result_cache_size'] if result_cache_size is None else result_cache_size
+        )
+        self.page_size = READ_API_CONFIG['page_size']
         self.conn = None
         self.cursor = None
+        self.commit_count = 0
+        # Bumped by writes total_changes does not count (scripts, rollbacks)
+        self.write_generation = 0
+        self.result_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     def connect(self):
         """Establish database connection."""
+        target = ':memory:' if self.in_memory else self.db_path
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            self.conn = sqlite3.connect(target, cached_statements=READ_API_CONFIG['cached_statements'])
             self.conn.row_factory = sqlite3.Row
+            # A new connection restarts total_changes, so cached generations are meaningless
+            self.result_cache.clear()
             self.cursor = self.conn.cursor()
             # Enable foreign keys
             self.cursor.execute('PRAGMA foreign_keys = ON')
-            logger.info(f"Connected to database: {self.db_path}")
+            if self.in_memory:
+                logger.info(f"Connected to in-memory database (target: {self.db_path})")
+            else:
+                logger.info(f"Connected to database: {self.db_path}")
         except sqlite3.Error as e:
             logger.error(f"Database connection failed: {e}")
             raise
@@ -66,17 +121,31 @@ class AsanaDatabase:
             logger.error(f"Batch execution failed: {e}")
             raise
     
+    def executescript(self, script: str):
+        """Execute a multi-statement SQL script (e.g. schema.sql)."""
+        self.write_generation += 1
+        try:
+            self.cursor.executescript(script)
+        except sqlite3.Error as e:
+            logger.error(f"Script execution failed: {e}")
+            raise
+    
     def commit(self):
         """Commit transaction."""
         try:
             self.conn.commit()
+            self.commit_count += 1
             logger.debug("Transaction committed")
         except sqlite3.Error as e:
             logger.error(f"Commit failed: {e}")
             raise
+        
+        if self.in_memory:
+            self._check_memory_budget()
     
     def rollback(self):
         """Rollback transaction."""
+        self.write_generation += 1
         try:
             self.conn.rollback()
             logger.info("Transaction rolled back")
@@ -84,6 +153,280 @@ class AsanaDatabase:
             logger.error(f"Rollback failed: {e}")
             raise
     
+    def get_database_size(self) -> int:
+        """Get current database size in bytes (page_count * page_size)."""
+        page_count = self.execute('PRAGMA page_count').fetchone()[0]
+        page_size = self.execute('PRAGMA page_size').fetchone()[0]
+        return page_count * page_size
+    
+    def _check_memory_budget(self):
+        """Move an in-memory build to disk once it exceeds the memory budget."""
+        size = self.get_database_size()
+        if size <= self.memory_budget_mb * 1024 * 1024:
+            return
+        
+        logger.warning(
+            f"In-memory database is {size / (1024 * 1024):.1f} MB, over the "
+            f"{self.memory_budget_mb} MB budget; continuing on disk"
+        )
+        self.move_to_disk()
+    
+    def move_to_disk(self):
+        """Write a committed in-memory database to db_path and continue on that file."""
+        self.flush_to_disk()
+        self.conn.close()
+        self.in_memory = False
+        self.connect()
+    
+    def flush_to_disk(self):
+        """
+        Write the in-memory database to db_path in one sequential pass.
+        
+        Uses VACUUM INTO, which also defragments the output, and falls back
+        to the backup API. The file is written under a temporary name and
+        moved into place so readers never see a partial database.
+        """
+        tmp_path = f"{self.db_path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        
+        try:
+            self.conn.execute('VACUUM INTO ?', (tmp_path,))
+        except sqlite3.OperationalError:
+            # VACUUM INTO requires SQLite 3.27+
+            disk_conn = sqlite3.connect(tmp_path)
+            try:
+                self.conn.backup(disk_conn)
+            finally:
+                disk_conn.close()
+        
+        os.replace(tmp_path, self.db_path)
+        logger.info(f"Wrote database to {self.db_path}")
+    
+    def finalize(self):
+        """Analyze the finished database; in-memory builds are written to disk."""
+        self.execute('ANALYZE')
+        self.commit()
+        if self.in_memory:
+            self.flush_to_disk()
+    
+    def build_materialized(self):
+        """
+        (Re)build team_workload_mat and user_productivity_mat from their views
+        in bulk, then install the triggers that track later changes.
+        """
+        self.drop_materialized()
+        self.executescript(materialized.CREATE_TABLES_SQL)
+        self.executescript(materialized.POPULATE_SQL)
+        self.executescript(materialized.CREATE_TRIGGERS_SQL)
+        self.commit()
+        logger.info("Built materialized team_workload and user_productivity tables")
+    
+    def drop_materialized(self):
+        """Drop the materialized tables and their triggers (e.g. before a bulk reload)."""
+        self.executescript(materialized.DROP_SQL)
+    
+    def has_materialized(self) -> bool:
+        """Whether the materialized tables exist."""
+        return self.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'materialized_dirty'"
+        ).fetchone() is not None
+    
+    def refresh_materialized(self) -> int:
+        """Recompute materialized rows of users and teams changed since the last refresh; returns how many."""
+        dirty = self.execute('SELECT COUNT(*) FROM materialized_dirty').fetchone()[0]
+        if dirty:
+            for statement in materialized.REFRESH_STATEMENTS:
+                self.execute(statement)
+            self.commit()
+            logger.debug(f"Refreshed materialized rows for {dirty} changed users/teams")
+        return dirty
+    
+    def build_rollups(self):
+        """(Re)build the daily project and team rollup tables from the loaded tasks and comments."""
+        self.drop_rollups()
+        self.executescript(rollups.CREATE_TABLES_SQL)
+        self.executescript(rollups.POPULATE_SQL)
+        self.commit()
+        logger.info("Built daily project and team rollups")
+    
+    def drop_rollups(self):
+        """Drop the rollup tables."""
+        self.executescript(rollups.DROP_SQL)
+    
+    def get_daily_rollup(
+        self,
+        project_id: str = None,
+        team_id: str = None,
+        start: date = None,
+        end: date = None
+    ) -> List[DailyRollup]:
+        """
+        Daily activity of a project or a team from start to end (inclusive), oldest first.
+        
+        Rows are a snapshot as of the last build_rollups().
+        """
+        if (project_id is None) == (team_id is None):
+            raise ValueError("Pass exactly one of project_id and team_id")
+        name, key = ('project_daily_activity', project_id) if project_id else ('team_daily_activity', team_id)
+        params = (key, str(start or date.min), str(end or date.max))
+        return self._read_query(DailyRollup, name, params)
+    
+    def build_search_index(self):
+        """(Re)build the FTS5 index over tasks and comments in bulk, then install its sync triggers."""
+        self.drop_search_index()
+        self.executescript(search.CREATE_TABLES_SQL.format(tokenizer=SEARCH_INDEX_CONFIG['tokenizer']))
+        self.executescript(search.POPULATE_SQL)
+        self.executescript(search.CREATE_TRIGGERS_SQL)
+        self.commit()
+        logger.info("Built full-text search index over tasks and comments")
+    
+    def drop_search_index(self):
+        """Drop the search index and its triggers (e.g. before a bulk reload)."""
+        self.executescript(search.DROP_SQL)
+    
+    def has_search_index(self) -> bool:
+        """Whether the search index exists."""
+        return self.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+        ).fetchone() is not None
+    
+    def search(self, text: str, table: str = 'tasks', limit: int = 20, raw: bool = False) -> list:
+        """
+        Tasks (or comments, with table='comments') matching text, best match first.
+        
+        text matches rows containing all of its words (stemmed); with
+        raw=True it is passed through as an FTS5 query (phrases, OR, NEAR,
+        prefix* and column filters).
+        """
+        if table not in search.SEARCH_SQL:
+            raise ValueError(f"Unknown search table: {table} (expected one of {list(search.SEARCH_SQL)})")
+        if not self.has_search_index():
+            raise RuntimeError("No search index; run with --search-index or call build_search_index()")
+        
+        match = text if raw else search.to_match_query(text)
+        if not match:
+            return []
+        query = search.SEARCH_SQL[table].format(name_weight=SEARCH_INDEX_CONFIG['name_weight'])
+        model_cls = Task if table == 'tasks' else Comment
+        return self._cached_read(
+            ('search', table, match, limit),
+            lambda: list(self.iter_records(model_cls, query, (match, limit)))
+        )
+    
+    def _read_workload_table(self, name: str, key: str, value: str = None) -> List[Dict[str, Any]]:
+        """Rows of the materialized table for view name, refreshed first; the view if not materialized."""
+        table = name
+        if self.has_materialized():
+            self.refresh_materialized()
+            table = f'{name}_mat'
+        if value is None:
+            rows = self.execute(f'SELECT * FROM {table}')
+        else:
+            rows = self.execute(f'SELECT * FROM {table} WHERE {key} = ?', (value,))
+        return [dict(row) for row in rows]
+    
+    def get_team_workload(self, team_id: str = None) -> List[TeamWorkload]:
+        """team_workload rows, for one team or all."""
+        return self._cached_read(
+            ('team_workload', team_id),
+            lambda: [TeamWorkload(**row) for row in self._read_workload_table('team_workload', 'team_id', team_id)]
+        )
+    
+    def get_user_productivity(self, user_id: str = None) -> List[UserProductivity]:
+        """user_productivity rows, for one user or all; overdue_tasks is as of each row's last refresh."""
+        return self._cached_read(
+            ('user_productivity', user_id),
+            lambda: [
+                UserProductivity(**row)
+                for row in self._read_workload_table('user_productivity', 'user_id', user_id)
+            ]
+        )
+    
+    def get_project_tasks(self, project_id: str, open_only: bool = False) -> List[Task]:
+        """A project's tasks, oldest first; with open_only, its open tasks soonest due first."""
+        return self._read_query(Task, 'project_open_tasks' if open_only else 'project_tasks', (project_id,))
+    
+    def get_section_tasks(self, section_id: str) -> List[Task]:
+        """A section's tasks, oldest first."""
+        return self._read_query(Task, 'section_tasks', (section_id,))
+    
+    def get_assignee_tasks(self, user_id: str, open_only: bool = False) -> List[Task]:
+        """Tasks assigned to a user (only open ones with open_only), soonest due first."""
+        return self._read_query(Task, 'user_open_tasks' if open_only else 'user_tasks', (user_id,))
+    
+    def get_overdue_tasks(self, limit: int = 100) -> List[Task]:
+        """Open tasks past their due date, most overdue first (as of the day a cached result was read)."""
+        return self._read_query(Task, 'overdue_tasks', (limit,))
+    
+    def get_comment_thread(self, task_id: str) -> List[Comment]:
+        """A task's comments, oldest first."""
+        return self._read_query(Comment, 'comment_thread', (task_id,))
+    
+    def iter_records(self, model_cls, query: str, params: tuple = (), page_size: int = None) -> Iterator:
+        """
+        Yield the rows of query as model_cls instances, fetched page_size at a time.
+        
+        Uses its own cursor, so other statements can run between pages.
+        """
+        try:
+            cursor = self.conn.execute(query, params)
+        except sqlite3.Error as e:
+            logger.error(f"Query execution failed: {query} | Error: {e}")
+            raise
+        page_size = page_size or self.page_size
+        try:
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row_to_record(row, model_cls)
+        finally:
+            cursor.close()
+    
+    def _read_query(self, model_cls, name: str, params: tuple) -> list:
+        """Rows of QUERY_SET[name] as model_cls instances, through the result cache."""
+        query = QUERY_SET[name][1]
+        return self._cached_read((name, params), lambda: list(self.iter_records(model_cls, query, params)))
+    
+    def _cache_generation(self) -> tuple:
+        """
+        Changes to the database so far; any write moves it.
+        
+        total_changes counts rows written through this connection (triggers
+        included), write_generation the writes it misses, and PRAGMA
+        data_version moves when another connection commits to the file.
+        """
+        data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        return (self.write_generation, self.conn.total_changes, data_version)
+    
+    def _cached_read(self, key: tuple, fetch: Callable[[], list]) -> list:
+        """
+        fetch() through the LRU result cache.
+        
+        An entry is reused only while the database is at the generation it
+        was read at, so cached results are never stale. The list is copied
+        but its records are shared; callers must not mutate them.
+        """
+        if not self.result_cache_size:
+            return fetch()
+        
+        entry = self.result_cache.get(key)
+        if entry is not None and entry[0] == self._cache_generation():
+            self.result_cache.move_to_end(key)
+            self.cache_hits += 1
+            return list(entry[1])
+        
+        self.cache_misses += 1
+        result = fetch()
+        # Taken after fetch(): reading workload tables may refresh them first
+        self.result_cache[key] = (self._cache_generation(), result)
+        self.result_cache.move_to_end(key)
+        if len(self.result_cache) > self.result_cache_size:
+            self.result_cache.popitem(last=False)
+        return list(result)
+    
     def insert_organization(self, **kwargs) -> str:
         """Insert organization record."""
         query = '''
@@ -195,6 +538,167 @@ class AsanaDatabase:
         ))
         return kwargs['task_id']
     
+    def insert_team_membership(self, **kwargs) -> str:
+        """Insert team membership record."""
+        query = '''
+            INSERT INTO team_memberships 
+            (membership_id, team_id, user_id, joined_at, role)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        self.execute(query, (
+            kwargs['membership_id'],
+            kwargs['team_id'],
+            kwargs['user_id'],
+            kwargs['joined_at'],
+            kwargs.get('role'),
+        ))
+        return kwargs['membership_id']
+    
+    def insert_section(self, **kwargs) -> str:
+        """Insert section record."""
+        query = '''
+            INSERT INTO sections (section_id, project_id, name, description, position, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        '''
+        self.execute(query, (
+            kwargs['section_id'],
+            kwargs['project_id'],
+            kwargs['name'],
+            kwargs.get('description'),
+            kwargs.get('position', 0),
+            kwargs['created_at'],
+        ))
+        return kwargs['section_id']
+    
+    def insert_task_assignee(self, **kwargs) -> str:
+        """Insert task assignment record."""
+        query = '''
+            INSERT INTO task_assignees (assignment_id, task_id, user_id, assigned_at, assigned_by_id)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        self.execute(query, (
+            kwargs['assignment_id'],
+            kwargs['task_id'],
+            kwargs['user_id'],
+            kwargs['assigned_at'],
+            kwargs.get('assigned_by_id'),
+        ))
+        return kwargs['assignment_id']
+    
+    def insert_subtask(self, **kwargs) -> str:
+        """Insert subtask record."""
+        query = '''
+            INSERT INTO subtasks 
+            (subtask_id, parent_task_id, name, description, created_at,
+             completed, completed_at, position, assigned_to_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        self.execute(query, (
+            kwargs['subtask_id'],
+            kwargs['parent_task_id'],
+            kwargs['name'],
+            kwargs.get('description'),
+            kwargs['created_at'],
+            kwargs.get('completed', False),
+            kwargs.get('completed_at'),
+            kwargs.get('position', 0),
+            kwargs.get('assigned_to_id'),
+        ))
+        return kwargs['subtask_id']
+    
+    def insert_comment(self, **kwargs) -> str:
+        """Insert comment record."""
+        query = '''
+            INSERT INTO comments 
+            (comment_id, task_id, user_id, content, created_at,
+             updated_at, is_edited, parent_comment_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        self.execute(query, (
+            kwargs['comment_id'],
+            kwargs['task_id'],
+            kwargs['user_id'],
+            kwargs['content'],
+            kwargs['created_at'],
+            kwargs.get('updated_at'),
+            kwargs.get('is_edited', False),
+            kwargs.get('parent_comment_id'),
+        ))
+        return kwargs['comment_id']
+    
+    def insert_custom_field_definition(self, **kwargs) -> str:
+        """Insert custom field definition record."""
+        query = '''
+            INSERT INTO custom_field_definitions 
+            (custom_field_id, project_id, name, field_type, description, required, options, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        self.execute(query, (
+            kwargs['custom_field_id'],
+            kwargs['project_id'],
+            kwargs['name'],
+            kwargs['field_type'],
+            kwargs.get('description'),
+            kwargs.get('required', False),
+            kwargs.get('options'),
+            kwargs['created_at'],
+        ))
+        return kwargs['custom_field_id']
+    
+    def insert_tag(self, **kwargs) -> str:
+        """Insert tag record."""
+        query = '''
+            INSERT INTO tags (tag_id, organization_id, name, color, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        self.execute(query, (
+            kwargs['tag_id'],
+            kwargs['organization_id'],
+            kwargs['name'],
+            kwargs.get('color'),
+            kwargs['created_at'],
+        ))
+        return kwargs['tag_id']
+    
+    def insert_task_tag(self, **kwargs) -> str:
+        """Insert task-tag association record."""
+        query = '''
+            INSERT INTO task_tags (task_tag_id, task_id, tag_id, added_at)
+            VALUES (?, ?, ?, ?)
+        '''
+        self.execute(query, (
+            kwargs['task_tag_id'],
+            kwargs['task_id'],
+            kwargs['tag_id'],
+            kwargs['added_at'],
+        ))
+        return kwargs['task_tag_id']
+    
+    def load_records(self, table: str, model_cls) -> list:
+        """
+        Load existing rows of a table back into dataclass instances.
+        
+        Timestamp and date columns are parsed back into datetime/date so
+        loaded records behave like freshly generated ones.
+        """
+        return [row_to_record(row, model_cls) for row in self.execute(f'SELECT * FROM {table}')]
+    
+    def clear_tables(self, tables: List[str]):
+        """Delete all rows from tables (dependent rows follow via ON DELETE)."""
+        for table in tables:
+            self.execute(f'DELETE FROM {table}')
+            logger.info(f"Cleared table: {table}")
+        self.commit()
+    
+    def load_from_disk(self):
+        """Copy the existing database at db_path into the in-memory connection."""
+        disk_conn = sqlite3.connect(self.db_path)
+        try:
+            disk_conn.backup(self.conn)
+        finally:
+            disk_conn.close()
+        logger.info(f"Loaded {self.db_path} into memory")
+    
     def get_tables_row_count(self) -> Dict[str, int]:
         """Get row count for all tables."""
         tables = [
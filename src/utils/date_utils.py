@@ -3,7 +3,6 @@
 import random
 import logging
 from datetime import datetime, timedelta, date
-from numpy.random import lognormal
 from config import TASK_DISTRIBUTIONS, WORKDAYS, PEAK_CREATION_DAYS
 
 logger = logging.getLogger(__name__)
@@ -52,6 +51,10 @@ class DateGenerator:
         second = random.randint(0, 59)
         
         creation_date = creation_date.replace(hour=hour, minute=minute, second=second)
+        
+        # Business hours later today are still in the future
+        if creation_date > now:
+            creation_date = now - timedelta(minutes=random.randint(1, 59))
         return creation_date
     
     @staticmethod
@@ -116,11 +119,11 @@ class DateGenerator:
         std = TASK_DISTRIBUTIONS['completion_time_std_days']
         
         # Convert to log-normal parameters
-        # lognormal takes mu and sigma (log-space)
+        # lognormvariate takes mu and sigma (log-space)
         mu = (mean ** 2) / ((std ** 2 + mean ** 2) ** 0.5)
         sigma = ((std ** 2) / (mean ** 2) + 1) ** 0.5
         
-        days_to_complete = max(1, int(lognormal(mu, sigma)))
+        days_to_complete = max(1, int(random.lognormvariate(mu, sigma)))
         
         # Completion is 1-14 days after creation
         days_to_complete = min(days_to_complete, 14)
@@ -142,6 +145,10 @@ class DateGenerator:
                     datetime.min.time()
                 ) + timedelta(hours=random.randint(8, 18))
         
+        # Capping or due-date adjustment must not move completion before creation
+        if completion_at < created_at:
+            completion_at = created_at
+        
         return completion_at
     
     @staticmethod
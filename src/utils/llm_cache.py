@@ -0,0 +1,139 @@
+# Persistent cache of LLM responses
+
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional
+from config import LLM_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CACHE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    puts INTEGER NOT NULL DEFAULT 1,  -- Times the provider returned this response
+    UNIQUE(cache_key, response)
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used_at ON responses(last_used_at);
+'''
+
+
+class LLMCache:
+    """
+    SQLite cache of LLM responses keyed by provider, model, temperature and
+    prompt hash.
+
+    Each key collects `variants` responses. Until it has, lookups miss so
+    the caller asks the provider for another one; after that, lookups
+    return a random stored variant. Repeated responses are stored once and
+    counted, so a provider that always answers the same still fills its
+    key. The least recently used responses are evicted once the cache
+    holds more than max_entries.
+    """
+
+    def __init__(self, path: str = None, variants: int = None, max_entries: int = None):
+        """Initialize cache; the file is opened on first use."""
+        self.path = path or LLM_CACHE_CONFIG['path']
+        self.variants = variants or LLM_CACHE_CONFIG['variants_per_prompt']
+        self.max_entries = max_entries or LLM_CACHE_CONFIG['max_entries']
+        self.conn = None
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        # Variant picks must not consume the seeded global random stream
+        self._rng = random.Random()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database, creating it if needed."""
+        if self.conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self.conn.executescript(CACHE_SCHEMA)
+            columns = {row[1] for row in self.conn.execute('PRAGMA table_info(responses)')}
+            if 'puts' not in columns:
+                # Caches written before responses were counted
+                self.conn.execute('ALTER TABLE responses ADD COLUMN puts INTEGER NOT NULL DEFAULT 1')
+            logger.info(f"LLM response cache: {self.path}")
+        return self.conn
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, prompt: str) -> str:
+        """Cache key for a request."""
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return json.dumps([provider, model, temperature, prompt_hash])
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response for key, or None if it should be generated."""
+        conn = self._connect()
+        rows = conn.execute(
+            'SELECT rowid, response, puts FROM responses WHERE cache_key = ?', (key,)
+        ).fetchall()
+
+        if sum(puts for _, _, puts in rows) < self.variants:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        rowid, response, _ = self._rng.choice(rows)
+        conn.execute('UPDATE responses SET last_used_at = ? WHERE rowid = ?', (time.time(), rowid))
+        self._wrote()
+        return response
+
+    def put(self, key: str, response: str):
+        """Store a response variant for key; a response already stored is counted again."""
+        now = time.time()
+        self._connect().execute(
+            'INSERT INTO responses (cache_key, response, created_at, last_used_at) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(cache_key, response) DO UPDATE SET puts = puts + 1, last_used_at = excluded.last_used_at',
+            (key, response, now, now)
+        )
+        self._wrote()
+
+    def _wrote(self):
+        """Commit and evict every few hundred writes."""
+        self._writes += 1
+        if self._writes % 500 == 0:
+            self.evict()
+            self.conn.commit()
+
+    def evict(self) -> int:
+        """Delete least recently used responses beyond max_entries; return how many."""
+        conn = self._connect()
+        count = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+
+        conn.execute(
+            'DELETE FROM responses WHERE rowid IN '
+            '(SELECT rowid FROM responses ORDER BY last_used_at LIMIT ?)',
+            (excess,)
+        )
+        logger.debug(f"Evicted {excess} cached LLM responses")
+        return excess
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else None
+
+    def stats(self) -> dict:
+        """Lookup counts and hit rate."""
+        return {'cache_hits': self.hits, 'cache_misses': self.misses, 'cache_hit_rate': self.hit_rate}
+
+    def close(self):
+        """Evict, commit and close the cache database."""
+        if self.conn is None:
+            return
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
@@ -1,135 +1,509 @@
 # LLM client for content generation
 
+import re
+import json
 import logging
 import os
-from typing import Optional
-from config import LLM_CONFIG
+import threading
+from collections import defaultdict
+from functools import partial
+from typing import Callable, List, Optional, Tuple
+from config import LLM_CONFIG, LLM_CACHE_CONFIG
+from src.utils.llm_cache import LLMCache
+from src.utils.resilience import ResilientCaller, CircuitOpenError
+from src.utils.scheduler import shutdown_executor
 
 logger = logging.getLogger(__name__)
 
+# Model used when LLM_CONFIG['model'] is not set
+DEFAULT_MODELS = {
+    'google': 'gemini-1.5-flash',
+    'openai': 'gpt-3.5-turbo',
+    'local': 'local-mock',
+}
+
+# Prompt kinds: kind -> (prompt template, max_tokens)
+PROMPTS = {
+    'task_name': ("""Generate a realistic Asana task name for a {project_type} project.
+Project context: {context}
+Requirements:
+- Keep it concise (max 10 words)
+- Use action verbs
+- Be specific and measurable
+Just return the task name, nothing else.""", 50),
+    'task_description': ("""Write a brief task description for an Asana task.
+Task: {task_name}
+Requirements:
+- Keep it 2-3 sentences max
+- Include acceptance criteria
+- Be professional
+Return only the description.""", 100),
+    'comment': ("""Generate a realistic Asana comment/discussion on this task:
+Task: {task_name}
+Requirements:
+- Keep it 1-2 sentences
+- Sound like a team member's comment
+- Be helpful and professional
+Return only the comment.""", 100),
+}
+
+# Multi-item prompt kinds: kind -> (prompt template, max_tokens per item).
+# task_name batches share one project type; the others list their tasks.
+BATCH_PROMPTS = {
+    'task_name': ("""Generate {count} distinct, realistic Asana task names for a {project_type} project.
+Project context: {context}
+Requirements:
+- Keep each concise (max 10 words)
+- Use action verbs
+- Be specific and measurable
+Return only a JSON array of {count} strings.""", 20),
+    'task_description': ("""Write a brief task description for each of these Asana tasks:
+{tasks}
+Requirements:
+- Keep each 2-3 sentences max
+- Include acceptance criteria
+- Be professional
+Return only a JSON array of {count} strings, one description per task, in the same order.""", 80),
+    'comment': ("""Generate a realistic Asana comment on each of these tasks:
+{tasks}
+Requirements:
+- Keep each 1-2 sentences
+- Sound like a team member's comment
+- Be helpful and professional
+Return only a JSON array of {count} strings, one comment per task, in the same order.""", 50),
+}
+
+# Longest accepted item per kind; task names must also be a single line
+MAX_ITEM_LENGTH = {
+    'task_name': 120,
+    'task_description': 1000,
+    'comment': 500,
+}
+
+
+def make_batches(kind: str, items: List[dict], batch_size: int) -> List[Tuple[List[int], dict]]:
+    """Split items into (item indexes, prompt fields) batches of at most batch_size."""
+    if kind == 'task_name':
+        groups = defaultdict(list)
+        for index, item in enumerate(items):
+            groups[(item['project_type'], item.get('context', ''))].append(index)
+        return [
+            (indexes[start:start + batch_size], {'project_type': project_type, 'context': context})
+            for (project_type, context), indexes in groups.items()
+            for start in range(0, len(indexes), batch_size)
+        ]
+
+    batches = []
+    for start in range(0, len(items), batch_size):
+        indexes = list(range(start, min(start + batch_size, len(items))))
+        tasks = '\n'.join(f"{n}. {items[i]['task_name']}" for n, i in enumerate(indexes, 1))
+        batches.append((indexes, {'tasks': tasks}))
+    return batches
+
+
+def parse_list_response(text: str, count: int) -> List[Optional[str]]:
+    """
+    Parse a multi-item response into count entries.
+
+    Accepts a JSON array (optionally in a code fence) or, failing that,
+    one item per line with numbering or bullets stripped. Missing and
+    non-string entries are None.
+    """
+    text = text.strip()
+    try:
+        values = json.loads(text[text.index('['):text.rindex(']') + 1])
+        if not isinstance(values, list):
+            raise ValueError("not a list")
+    except ValueError:
+        values = [
+            re.sub(r'^(?:\d+[.)]|[-*\u2022])\s*', '', line.strip())
+            for line in text.splitlines()
+            if line.strip() and not line.strip().startswith('```')
+        ]
+
+    values = [value.strip() if isinstance(value, str) else None for value in values[:count]]
+    return values + [None] * (count - len(values))
+
+
+def validate_item(kind: str, value: Optional[str]) -> Optional[str]:
+    """Return value if it is usable output for kind, else None."""
+    if not value or len(value) > MAX_ITEM_LENGTH[kind]:
+        return None
+    if kind == 'task_name' and '\n' in value:
+        return None
+    return value
+
+
+def template_fallback(kind: str) -> Callable[[dict], Optional[str]]:
+    """Template generator standing in for the LLM for one prompt kind."""
+    # Imported here: the generators are not needed unless a call falls back
+    from src.generators.tasks import TaskGenerator
+    from src.generators.stubs import CommentGenerator
+
+    if kind == 'task_name':
+        return lambda item: TaskGenerator.generate_task_name(item.get('project_type'))
+    if kind == 'task_description':
+        return lambda item: TaskGenerator.generate_task_description()
+    if kind == 'comment':
+        return lambda item: CommentGenerator.COMMENT_POOL.draw()
+    raise ValueError(f"Unknown prompt kind: {kind}")
+
+
 class LLMClient:
     """Client for LLM-based content generation."""
     
-    def __init__(self, provider: str = None):
-        """Initialize LLM client."""
+    def __init__(self, provider: str = None, cache: LLMCache = None):
+        """Initialize LLM client; cache defaults to the persistent response cache if enabled."""
         self.provider = provider or LLM_CONFIG['provider']
+        self.model = LLM_CONFIG.get('model') or DEFAULT_MODELS.get(self.provider)
         self.api_key = None
         self.client = None
-        self._init_client()
+        if cache is None and LLM_CACHE_CONFIG['enabled']:
+            cache = LLMCache()
+        self.cache = cache
+        self.stats = {'requests': 0, 'failures': 0, 'timeouts': 0, 'fallbacks': 0}
+        self.caller = ResilientCaller(f'LLM ({self.provider})')
+        self._initialized = False
     
     def _init_client(self):
-        """Initialize the appropriate LLM client."""
+        """Initialize the appropriate LLM client; SDKs are imported only when a key is set."""
         if self.provider == 'google':
+            api_key = os.getenv('GOOGLE_API_KEY')
+            if not api_key:
+                logger.warning("GOOGLE_API_KEY not set, LLM generation disabled")
+                return
             try:
                 import google.generativeai as genai
-                api_key = os.getenv('GOOGLE_API_KEY')
-                if api_key:
-                    genai.configure(api_key=api_key)
-                    self.client = genai
-                    logger.info("Google Generative AI client initialized")
-                else:
-                    logger.warning("GOOGLE_API_KEY not set, LLM generation disabled")
+                genai.configure(api_key=api_key)
+                self.client = genai.GenerativeModel(self.model)
+                logger.info("Google Generative AI client initialized")
             except ImportError:
                 logger.warning("google-generativeai not installed")
         
         elif self.provider == 'openai':
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                logger.warning("OPENAI_API_KEY not set, LLM generation disabled")
+                return
             try:
                 from openai import OpenAI
-                api_key = os.getenv('OPENAI_API_KEY')
-                if api_key:
-                    self.client = OpenAI(api_key=api_key)
-                    logger.info("OpenAI client initialized")
-                else:
-                    logger.warning("OPENAI_API_KEY not set, LLM generation disabled")
+                self.client = OpenAI(api_key=api_key)
+                logger.info("OpenAI client initialized")
             except ImportError:
                 logger.warning("openai not installed")
+        
+        elif self.provider == 'local':
+            from src.utils.local_llm import LocalLLM
+            self.client = LocalLLM()
+            logger.info("Local mock LLM initialized")
     
-    def generate_task_name(self, project_type: str, context: str = "") -> Optional[str]:
-        """Generate realistic task name using LLM."""
-        if not self.client or not LLM_CONFIG['use_llm']:
+    @property
+    def enabled(self) -> bool:
+        """Whether calls go to the LLM at all; the provider client is set up on first use."""
+        if not LLM_CONFIG['use_llm']:
+            return False
+        if not self._initialized:
+            self._initialized = True
+            self._init_client()
+        return self.client is not None
+    
+    def _complete(self, prompt: str, max_tokens: int) -> str:
+        """Send one prompt to the provider and return the response text; raises on failure."""
+        if self.provider == 'google':
+            response = self.client.generate_content(
+                prompt,
+                generation_config={
+                    'max_output_tokens': max_tokens,
+                    'temperature': LLM_CONFIG['temperature'],
+                },
+            )
+            return response.text.strip()
+        elif self.provider == 'openai':
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=LLM_CONFIG['temperature']
+            )
+            return response.choices[0].message.content.strip()
+        elif self.provider == 'local':
+            return self.client.complete(prompt, max_tokens, LLM_CONFIG['temperature'])
+        raise ValueError(f"Unsupported LLM provider: {self.provider}")
+    
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        """Response cache key for prompt, or None without a cache."""
+        if self.cache is None:
+            return None
+        return LLMCache.make_key(self.provider, self.model, LLM_CONFIG['temperature'], prompt)
+    
+    def _generate(self, kind: str, **fields) -> Optional[str]:
+        """Generate one completion for a prompt kind, or None if the LLM is off or fails."""
+        if not self.enabled:
             return None
         
-        try:
-            prompt = f"""Generate a realistic Asana task name for a {project_type} project.
-Project context: {context}
-Requirements:
-- Keep it concise (max 10 words)
-- Use action verbs
-- Be specific and measurable
-Just return the task name, nothing else."""
-            
-            if self.provider == 'google':
-                response = self.client.generate_content(prompt)
-                return response.text.strip()
-            elif self.provider == 'openai':
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=50,
-                    temperature=LLM_CONFIG['temperature']
-                )
-                return response.choices[0].message.content.strip()
+        template, max_tokens = PROMPTS[kind]
+        prompt = template.format(**fields)
+        key = self._cache_key(prompt)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
         
+        self.stats['requests'] += 1
+        try:
+            response = self.caller.call(self._complete, prompt, max_tokens)
+        except CircuitOpenError:
+            return None
         except Exception as e:
+            self.stats['failures'] += 1
             logger.warning(f"LLM generation failed: {e}")
             return None
+        if key is not None:
+            self.cache.put(key, response)
+        return response
+    
+    def generate_task_name(self, project_type: str, context: str = "") -> Optional[str]:
+        """Generate realistic task name using LLM."""
+        return self._generate('task_name', project_type=project_type, context=context)
     
     def generate_task_description(self, task_name: str) -> Optional[str]:
         """Generate task description using LLM."""
-        if not self.client or not LLM_CONFIG['use_llm']:
-            return None
-        
-        try:
-            prompt = f"""Write a brief task description for an Asana task.
-Task: {task_name}
-Requirements:
-- Keep it 2-3 sentences max
-- Include acceptance criteria
-- Be professional
-Return only the description."""
-            
-            if self.provider == 'google':
-                response = self.client.generate_content(prompt)
-                return response.text.strip()
-            elif self.provider == 'openai':
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=100,
-                    temperature=LLM_CONFIG['temperature']
-                )
-                return response.choices[0].message.content.strip()
-        
-        except Exception as e:
-            logger.warning(f"LLM generation failed: {e}")
-            return None
+        return self._generate('task_description', task_name=task_name)
     
     def generate_comment(self, task_name: str) -> Optional[str]:
         """Generate realistic task comment using LLM."""
-        if not self.client or not LLM_CONFIG['use_llm']:
-            return None
+        return self._generate('comment', task_name=task_name)
+    
+    async def _complete_async(self, prompt: str, max_tokens: int, executor, settled: threading.Event = None) -> str:
+        """
+        Run one provider call, with rate limiting and retries, on the batch's thread pool.
         
+        settled is passed to ResilientCaller.call (see abandon()).
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        call = partial(self.caller.call, self._complete, prompt, max_tokens, settled=settled)
+        return await loop.run_in_executor(executor, call)
+    
+    async def _complete_many_async(
+        self,
+        prompts: List[Tuple[str, int]],
+        concurrency: int = None,
+        timeout: float = None
+    ) -> List[Optional[str]]:
+        """
+        Complete (prompt, max_tokens) pairs concurrently, through the cache.
+        
+        At most `concurrency` requests are in flight and each gets `timeout`
+        seconds. Returns responses in input order, None where a request
+        failed or timed out.
+        """
+        # asyncio is only needed once a batch actually goes to the provider
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        
+        concurrency = concurrency or LLM_CONFIG.get('concurrency', 8)
+        timeout = timeout or LLM_CONFIG.get('timeout', 30)
+        semaphore = asyncio.Semaphore(concurrency)
+        key_locks = defaultdict(asyncio.Lock)
+        
+        async def complete(prompt: str, max_tokens: int) -> Optional[str]:
+            key = self._cache_key(prompt)
+            if key is None:
+                return await request(prompt, max_tokens, None)
+            # Requests for one prompt take turns, so the cache fills its
+            # variants and then serves the rest instead of every item missing
+            async with key_locks[key]:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached
+                return await request(prompt, max_tokens, key)
+        
+        async def acquire_slot(breaker):
+            """Take a concurrency slot once no recovery probe is in flight; waiting never holds one."""
+            while True:
+                while breaker.state == breaker.HALF_OPEN:
+                    await asyncio.sleep(0.01)
+                await semaphore.acquire()
+                # A probe may have started while this request queued for the slot
+                if breaker.state != breaker.HALF_OPEN:
+                    return
+                semaphore.release()
+        
+        async def request(prompt: str, max_tokens: int, key: Optional[str]) -> Optional[str]:
+            breaker = self.caller.breaker
+            # Wait out a recovery probe, then fall back straight away if the
+            # provider is still considered down
+            await acquire_slot(breaker)
+            try:
+                if breaker.is_open():
+                    self.caller.stats['rejected'] += 1
+                    return None
+                self.stats['requests'] += 1
+                settled = threading.Event()
+                try:
+                    response = await asyncio.wait_for(
+                        self._complete_async(prompt, max_tokens, executor, settled),
+                        timeout,
+                    )
+                except asyncio.TimeoutError:
+                    self.stats['timeouts'] += 1
+                    # The call keeps running on its thread; count it as one
+                    # failure here and keep its late outcome off the breaker
+                    if self.caller.abandon(settled):
+                        breaker.record_failure()
+                    logger.debug(f"LLM request timed out after {timeout}s")
+                    return None
+                except CircuitOpenError:
+                    return None
+                except Exception as e:
+                    self.stats['failures'] += 1
+                    logger.debug(f"LLM request failed: {e}")
+                    return None
+            finally:
+                semaphore.release()
+            if key is not None:
+                self.cache.put(key, response)
+            return response
+        
+        # Timed-out calls keep running on their thread; don't wait for them
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='llm')
         try:
-            prompt = f"""Generate a realistic Asana comment/discussion on this task:
-Task: {task_name}
-Requirements:
-- Keep it 1-2 sentences
-- Sound like a team member's comment
-- Be helpful and professional
-Return only the comment."""
-            
-            if self.provider == 'google':
-                response = self.client.generate_content(prompt)
-                return response.text.strip()
-            elif self.provider == 'openai':
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=100,
-                    temperature=LLM_CONFIG['temperature']
-                )
-                return response.choices[0].message.content.strip()
+            return list(await asyncio.gather(*(complete(*prompt) for prompt in prompts)))
+        finally:
+            shutdown_executor(executor, wait=False)
+    
+    def _fill_fallbacks(self, kind: str, items: List[dict], results: list, fallback: Callable) -> list:
+        """
+        Replace missing results with fallback(item) and log how many.
         
-        except Exception as e:
-            logger.warning(f"LLM generation failed: {e}")
-            return None
+        A fallback returning None (e.g. a caller keeping the text it already
+        has) is logged as kept rather than as a template fallback.
+        """
+        failed = [i for i, result in enumerate(results) if result is None]
+        for i in failed:
+            results[i] = fallback(items[i])
+        self.stats['fallbacks'] += len(failed)
+        if failed and self.enabled:
+            kept = sum(1 for i in failed if results[i] is None)
+            if len(failed) > kept:
+                logger.warning(f"LLM {kind}: {len(failed) - kept} of {len(items)} item(s) used template fallback")
+            if kept:
+                logger.warning(f"LLM {kind}: {kept} of {len(items)} item(s) kept existing text")
+        return results
+    
+    async def generate_many_async(
+        self,
+        kind: str,
+        items: List[dict],
+        fallback: Callable[[dict], Optional[str]] = None,
+        concurrency: int = None,
+        timeout: float = None
+    ) -> List[Optional[str]]:
+        """
+        Generate one completion per item (the prompt's fields) concurrently.
+        
+        Results come back in input order; an item whose request fails or
+        times out gets fallback(item) instead (the template generator for
+        kind by default).
+        """
+        if fallback is None:
+            fallback = template_fallback(kind)
+        
+        results = [None] * len(items)
+        if self.enabled:
+            template, max_tokens = PROMPTS[kind]
+            prompts = [(template.format(**item), max_tokens) for item in items]
+            results = await self._complete_many_async(prompts, concurrency, timeout)
+        return self._fill_fallbacks(kind, items, results, fallback)
+    
+    async def generate_batched_async(
+        self,
+        kind: str,
+        items: List[dict],
+        fallback: Callable[[dict], Optional[str]] = None,
+        batch_size: int = None,
+        concurrency: int = None,
+        timeout: float = None
+    ) -> List[Optional[str]]:
+        """
+        Generate completions for up to batch_size items per request.
+        
+        Each response is parsed into a list and every entry is validated;
+        items that are missing or invalid get fallback(item). Batches run
+        concurrently like generate_many_async.
+        """
+        if fallback is None:
+            fallback = template_fallback(kind)
+        batch_size = batch_size or LLM_CONFIG.get('batch_size', 25)
+        
+        results = [None] * len(items)
+        if self.enabled:
+            batches = make_batches(kind, items, batch_size)
+            template, tokens_per_item = BATCH_PROMPTS[kind]
+            prompts = [
+                (template.format(count=len(indexes), **fields), tokens_per_item * len(indexes))
+                for indexes, fields in batches
+            ]
+            responses = await self._complete_many_async(prompts, concurrency, timeout)
+            for (indexes, _), response in zip(batches, responses):
+                if response is None:
+                    continue
+                parsed = parse_list_response(response, len(indexes))
+                for index, value in zip(indexes, parsed):
+                    results[index] = validate_item(kind, value)
+        return self._fill_fallbacks(kind, items, results, fallback)
+    
+    def get_stats(self) -> dict:
+        """Request, failure, retry and fallback counts, circuit state, and cache hit rate when caching."""
+        stats = dict(self.stats)
+        stats.update(self.caller.stats)
+        stats['circuit'] = self.caller.breaker.state
+        if self.cache is not None:
+            stats.update(self.cache.stats())
+        return stats
+    
+    def close(self):
+        """Log request stats, then flush and close the response cache."""
+        stats = self.get_stats()
+        if stats['requests'] or stats.get('cache_hits'):
+            logger.info(f"LLM stats: {stats}")
+        if self.cache is not None:
+            self.cache.close()
+    
+    def generate_many(self, kind: str, items: List[dict], **kwargs) -> List[Optional[str]]:
+        """Blocking wrapper around generate_many_async (not for use inside a running event loop)."""
+        import asyncio
+        return asyncio.run(self.generate_many_async(kind, items, **kwargs))
+    
+    def generate_batched(self, kind: str, items: List[dict], **kwargs) -> List[Optional[str]]:
+        """Blocking wrapper around generate_batched_async (not for use inside a running event loop)."""
+        import asyncio
+        return asyncio.run(self.generate_batched_async(kind, items, **kwargs))
+    
+    def generate_task_names(self, project_types: List[str], context: str = "", **kwargs) -> List[str]:
+        """Generate one task name per project type, concurrently."""
+        items = [{'project_type': project_type, 'context': context} for project_type in project_types]
+        return self.generate_many('task_name', items, **kwargs)
+    
+    def generate_task_descriptions(self, task_names: List[str], **kwargs) -> List[Optional[str]]:
+        """Generate one description per task name, concurrently."""
+        return self.generate_many('task_description', [{'task_name': name} for name in task_names], **kwargs)
+    
+    def generate_comments(self, task_names: List[str], **kwargs) -> List[str]:
+        """Generate one comment per task name, concurrently."""
+        return self.generate_many('comment', [{'task_name': name} for name in task_names], **kwargs)
+
+    
+    def generate_task_names_batch(self, project_type: str, count: int, context: str = "", **kwargs) -> List[str]:
+        """Generate count task names for one project type, many per request."""
+        items = [{'project_type': project_type, 'context': context}] * count
+        return self.generate_batched('task_name', items, **kwargs)
+    
+    def generate_task_descriptions_batch(self, task_names: List[str], **kwargs) -> List[Optional[str]]:
+        """Generate one description per task name, many per request."""
+        return self.generate_batched('task_description', [{'task_name': name} for name in task_names], **kwargs)
+    
+    def generate_comments_batch(self, task_names: List[str], **kwargs) -> List[str]:
+        """Generate one comment per task name, many per request."""
+        return self.generate_batched('comment', [{'task_name': name} for name in task_names], **kwargs)
@@ -0,0 +1,97 @@
+# In-process stand-in for an LLM provider
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import Counter
+from config import LLM_LOCAL_CONFIG
+
+# Vocabulary the fake responses are assembled from
+ACTIONS = ['Implement', 'Review', 'Update', 'Draft', 'Audit', 'Plan', 'Test', 'Document', 'Migrate', 'Analyze']
+SUBJECTS = [
+    'checkout flow', 'onboarding email', 'billing API', 'quarterly budget', 'release notes',
+    'search index', 'vendor contract', 'landing page', 'access policy', 'metrics dashboard',
+]
+SENTENCES = [
+    "Scope is limited to the current quarter.",
+    "Done when the change is reviewed and deployed.",
+    "Coordinate with the owning team before starting.",
+    "Acceptance criteria: tests pass and docs are updated.",
+    "Share a short summary in the project channel when finished.",
+]
+COMMENTS = [
+    "Picked this up, will update by end of day.",
+    "Left a few review notes, mostly minor.",
+    "Blocked on access, pinged the owner.",
+    "Looks good to me, ready to ship.",
+    "Can we move the due date by two days?",
+]
+
+# Reply kind by the fixed opening of the PROMPTS / BATCH_PROMPTS templates
+# (llm_client.py); matched only at the start of a prompt, so task names and
+# project context filled into the templates never change the kind
+PROMPT_KINDS = [
+    (re.compile(r'Generate (?:a realistic Asana task name|\d+ distinct, realistic Asana task names) '), 'task_name'),
+    (re.compile(r'Write a brief task description for '), 'task_description'),
+    (re.compile(r'Generate a realistic Asana comment'), 'comment'),
+]
+
+# Last line of a multi-item template
+BATCH_MARKER = re.compile(r'Return only a JSON array of (\d+) strings')
+
+
+class LocalLLM:
+    """
+    Fake LLM provider for offline runs and benchmarks.
+
+    complete() sleeps for latency_ms ± jitter_ms, fails with probability
+    error_rate, and otherwise returns text derived from a hash of the prompt
+    and how often that prompt has been seen, so a run's outputs are
+    reproducible while repeated prompts still get different variants.
+    Multi-item prompts (ending "Return only a JSON array of N strings...")
+    get a JSON array.
+    """
+
+    def __init__(self, latency_ms: float = None, jitter_ms: float = None,
+                 error_rate: float = None, seed: int = None):
+        """Initialize provider; unset options come from LLM_LOCAL_CONFIG."""
+        self.latency_ms = LLM_LOCAL_CONFIG['latency_ms'] if latency_ms is None else latency_ms
+        self.jitter_ms = LLM_LOCAL_CONFIG['jitter_ms'] if jitter_ms is None else jitter_ms
+        self.error_rate = LLM_LOCAL_CONFIG['error_rate'] if error_rate is None else error_rate
+        self.seed = LLM_LOCAL_CONFIG['seed'] if seed is None else seed
+        self.calls = 0
+        self._seen = Counter()
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: str, max_tokens: int = 100, temperature: float = 0.7) -> str:
+        """Return a fake completion for prompt; raises RuntimeError at error_rate."""
+        with self._lock:
+            self.calls += 1
+            variant = self._seen[prompt]
+            self._seen[prompt] += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = self._rng.random() < self.error_rate
+
+        time.sleep(delay)
+        if fail:
+            raise RuntimeError("local LLM: simulated provider error")
+
+        rng = random.Random(hashlib.sha256(f'{self.seed}:{variant}:{prompt}'.encode('utf-8')).digest())
+        match = BATCH_MARKER.match(prompt.rsplit('\n', 1)[-1])
+        if match:
+            return json.dumps([self._text(prompt, rng) for _ in range(int(match.group(1)))])
+        return self._text(prompt, rng)
+
+    @staticmethod
+    def _text(prompt: str, rng: random.Random) -> str:
+        """One response item shaped like what the prompt asks for; descriptions for unknown prompts."""
+        kind = next((kind for pattern, kind in PROMPT_KINDS if pattern.match(prompt)), 'task_description')
+        if kind == 'task_name':
+            return f"{rng.choice(ACTIONS)} {rng.choice(SUBJECTS)}"
+        if kind == 'comment':
+            return rng.choice(COMMENTS)
+        return " ".join(rng.sample(SENTENCES, 2))
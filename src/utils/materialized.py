@@ -0,0 +1,183 @@
+# Materialized counterparts of the team_workload and user_productivity views
+#
+# The tables are filled in bulk from the views once the data is loaded.
+# Triggers then record which users and teams a later change touches in
+# materialized_dirty (task assignment or reassignment, completion or due
+# date, team membership, renames), and refresh recomputes only those rows.
+# overdue_tasks is computed against DATE('now') when a row is refreshed.
+
+MATERIALIZED_TABLES = ['team_workload_mat', 'user_productivity_mat', 'materialized_dirty']
+
+CREATE_TABLES_SQL = '''
+CREATE TABLE team_workload_mat (
+    team_id TEXT PRIMARY KEY,
+    team_name TEXT,
+    num_team_members INTEGER NOT NULL,
+    total_assigned_tasks INTEGER NOT NULL,
+    open_tasks INTEGER,
+    completed_tasks INTEGER
+) WITHOUT ROWID;
+
+CREATE TABLE user_productivity_mat (
+    user_id TEXT PRIMARY KEY,
+    name TEXT,
+    total_assigned_tasks INTEGER NOT NULL,
+    completed_tasks INTEGER,
+    completion_percentage REAL,
+    overdue_tasks INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE materialized_dirty (
+    kind TEXT NOT NULL,  -- 'user' or 'team'
+    key TEXT NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+'''
+
+POPULATE_SQL = '''
+INSERT INTO team_workload_mat SELECT * FROM team_workload;
+INSERT INTO user_productivity_mat SELECT * FROM user_productivity;
+'''
+
+CREATE_TRIGGERS_SQL = '''
+CREATE TRIGGER mat_task_assignees_insert AFTER INSERT ON task_assignees
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('user', NEW.user_id);
+END;
+
+CREATE TRIGGER mat_task_assignees_delete AFTER DELETE ON task_assignees
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('user', OLD.user_id);
+END;
+
+CREATE TRIGGER mat_task_assignees_update AFTER UPDATE OF user_id, task_id ON task_assignees
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('user', OLD.user_id);
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('user', NEW.user_id);
+END;
+
+CREATE TRIGGER mat_tasks_update AFTER UPDATE OF completed, due_date ON tasks
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty
+    SELECT 'user', user_id FROM task_assignees WHERE task_id = NEW.task_id;
+END;
+
+CREATE TRIGGER mat_team_memberships_insert AFTER INSERT ON team_memberships
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('team', NEW.team_id);
+END;
+
+CREATE TRIGGER mat_team_memberships_delete AFTER DELETE ON team_memberships
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('team', OLD.team_id);
+END;
+
+CREATE TRIGGER mat_team_memberships_update AFTER UPDATE OF user_id, team_id ON team_memberships
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('team', OLD.team_id);
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('team', NEW.team_id);
+END;
+
+CREATE TRIGGER mat_users_insert AFTER INSERT ON users
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('user', NEW.user_id);
+END;
+
+CREATE TRIGGER mat_users_delete AFTER DELETE ON users
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('user', OLD.user_id);
+END;
+
+CREATE TRIGGER mat_users_update AFTER UPDATE OF name ON users
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('user', NEW.user_id);
+END;
+
+CREATE TRIGGER mat_teams_update AFTER UPDATE OF name ON teams
+BEGIN
+    INSERT OR IGNORE INTO materialized_dirty VALUES ('team', NEW.team_id);
+END;
+'''
+
+DROP_SQL = '''
+DROP TABLE IF EXISTS team_workload_mat;
+DROP TABLE IF EXISTS user_productivity_mat;
+DROP TABLE IF EXISTS materialized_dirty;
+DROP TRIGGER IF EXISTS mat_task_assignees_insert;
+DROP TRIGGER IF EXISTS mat_task_assignees_delete;
+DROP TRIGGER IF EXISTS mat_task_assignees_update;
+DROP TRIGGER IF EXISTS mat_tasks_update;
+DROP TRIGGER IF EXISTS mat_team_memberships_insert;
+DROP TRIGGER IF EXISTS mat_team_memberships_delete;
+DROP TRIGGER IF EXISTS mat_team_memberships_update;
+DROP TRIGGER IF EXISTS mat_users_insert;
+DROP TRIGGER IF EXISTS mat_users_delete;
+DROP TRIGGER IF EXISTS mat_users_update;
+DROP TRIGGER IF EXISTS mat_teams_update;
+'''
+
+# Recompute the dirty rows, run in order in one transaction. The queries
+# are the view definitions restricted to the dirty keys, so a refresh costs
+# O(affected users' assignments).
+REFRESH_STATEMENTS = [
+    '''
+INSERT OR IGNORE INTO materialized_dirty
+SELECT 'team', tm.team_id
+FROM materialized_dirty d
+JOIN team_memberships tm ON tm.user_id = d.key
+WHERE d.kind = 'user'
+''',
+    '''
+DELETE FROM user_productivity_mat
+WHERE user_id IN (SELECT key FROM materialized_dirty WHERE kind = 'user')
+''',
+    '''
+INSERT INTO user_productivity_mat
+SELECT
+    u.user_id,
+    u.name,
+    COUNT(DISTINCT ta.task_id),
+    SUM(CASE WHEN t.completed = 1 THEN 1 ELSE 0 END),
+    ROUND(
+        CAST(SUM(CASE WHEN t.completed = 1 THEN 1 ELSE 0 END) AS FLOAT) /
+        NULLIF(COUNT(DISTINCT ta.task_id), 0) * 100, 2
+    ),
+    COALESCE(od.overdue_tasks, 0)
+FROM users u
+LEFT JOIN task_assignees ta ON u.user_id = ta.user_id
+LEFT JOIN tasks t ON ta.task_id = t.task_id
+LEFT JOIN (
+    SELECT ota.user_id, COUNT(*) AS overdue_tasks
+    FROM tasks ot
+    JOIN task_assignees ota ON ota.task_id = ot.task_id
+    WHERE ot.completed = 0 AND ot.due_date < DATE('now')
+      AND ota.user_id IN (SELECT key FROM materialized_dirty WHERE kind = 'user')
+    GROUP BY ota.user_id
+) od ON od.user_id = u.user_id
+WHERE u.user_id IN (SELECT key FROM materialized_dirty WHERE kind = 'user')
+GROUP BY u.user_id, u.name
+''',
+    '''
+DELETE FROM team_workload_mat
+WHERE team_id IN (SELECT key FROM materialized_dirty WHERE kind = 'team')
+''',
+    '''
+INSERT INTO team_workload_mat
+SELECT
+    tm.team_id,
+    t.name,
+    COUNT(DISTINCT ta.user_id),
+    COUNT(DISTINCT ta.task_id),
+    SUM(CASE WHEN tsk.completed = 0 THEN 1 ELSE 0 END),
+    SUM(CASE WHEN tsk.completed = 1 THEN 1 ELSE 0 END)
+FROM team_memberships tm
+JOIN teams t ON tm.team_id = t.team_id
+LEFT JOIN task_assignees ta ON tm.user_id = ta.user_id
+LEFT JOIN tasks tsk ON ta.task_id = tsk.task_id
+WHERE tm.team_id IN (SELECT key FROM materialized_dirty WHERE kind = 'team')
+GROUP BY tm.team_id, t.name
+''',
+    '''
+DELETE FROM materialized_dirty
+''',
+]
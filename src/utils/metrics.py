@@ -0,0 +1,209 @@
+# Pipeline performance instrumentation
+
+import json
+import sys
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Stage metrics summed when the same stage is recorded more than once
+ADDITIVE_METRICS = (
+    'wall_seconds', 'cpu_seconds', 'build_seconds', 'write_seconds',
+    'rows', 'bytes_written', 'commits',
+)
+
+
+def get_peak_rss_bytes() -> Optional[int]:
+    """Get peak resident set size of this process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def get_io_write_bytes() -> Optional[int]:
+    """Get bytes this process caused to be written to storage (Linux only)."""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('write_bytes:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class RunMetrics:
+    """
+    Record wall time, CPU time, rows, bytes written, commits and peak RSS
+    for each pipeline stage, and write them out as a run report.
+    """
+
+    def __init__(self, db, verbose: bool = True):
+        """Initialize metrics for a pipeline run against db (AsanaDatabase)."""
+        self.db = db
+        self.verbose = verbose
+        self.stages = []
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self._run_start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, build_wall: float = 0.0, build_cpu: float = 0.0):
+        """
+        Measure the enclosed block as pipeline stage name.
+
+        build_wall/build_cpu account for record generation that ran before
+        the block, possibly in a worker process; they are added to the
+        stage's wall and CPU time.
+        """
+        conn = self.db.conn
+        start_changes = conn.total_changes
+        start_commits = self.db.commit_count
+        start_size = self.db.get_database_size()
+        start_io = get_io_write_bytes()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+
+        try:
+            yield
+        finally:
+            write_wall = time.perf_counter() - start_wall
+            wall = build_wall + write_wall
+            cpu = build_cpu + time.process_time() - start_cpu
+
+            # An in-memory build that spilled to disk has a new connection
+            if self.db.conn is conn:
+                rows = self.db.conn.total_changes - start_changes
+            else:
+                rows = self.db.conn.total_changes
+
+            end_size = self.db.get_database_size()
+            end_io = get_io_write_bytes()
+            if start_io is not None and end_io is not None:
+                bytes_written = end_io - start_io
+            else:
+                bytes_written = max(0, end_size - start_size)
+
+            metrics = {
+                'stage': name,
+                'wall_seconds': round(wall, 6),
+                'cpu_seconds': round(cpu, 6),
+                'build_seconds': round(build_wall, 6),
+                'write_seconds': round(write_wall, 6),
+                'rows': rows,
+                'rows_per_second': round(rows / wall, 1) if wall > 0 else None,
+                'bytes_written': bytes_written,
+                'db_size_bytes': end_size,
+                'commits': self.db.commit_count - start_commits,
+                'peak_rss_bytes': get_peak_rss_bytes(),
+            }
+            self.record(metrics)
+
+    def record(self, metrics: dict):
+        """
+        Add a stage's metrics to the run.
+
+        A stage recorded again (once per organization in a multi-tenant run,
+        or merged from a shard's metrics) is accumulated into one entry.
+        """
+        existing = next((s for s in self.stages if s['stage'] == metrics['stage']), None)
+        if existing is None:
+            self.stages.append(dict(metrics))
+            log = logger.info if self.verbose else logger.debug
+        else:
+            for key in ADDITIVE_METRICS:
+                existing[key] = round(existing[key] + metrics[key], 6)
+            for key in ('db_size_bytes', 'peak_rss_bytes'):
+                existing[key] = max(existing[key] or 0, metrics[key] or 0) or None
+            wall = existing['wall_seconds']
+            existing['rows_per_second'] = round(existing['rows'] / wall, 1) if wall > 0 else None
+            log = logger.debug
+
+        log(
+            f"Stage {metrics['stage']}: {metrics['wall_seconds']:.2f}s wall, "
+            f"{metrics['cpu_seconds']:.2f}s CPU, {metrics['rows']} rows"
+            + (f" ({metrics['rows_per_second']:.0f} rows/s)" if metrics['rows_per_second'] else "")
+        )
+
+    def log_stages(self):
+        """Log the accumulated metrics of every recorded stage."""
+        for s in self.stages:
+            logger.info(
+                f"Stage {s['stage']}: {s['wall_seconds']:.2f}s wall, {s['cpu_seconds']:.2f}s CPU, "
+                f"{s['rows']} rows" + (f" ({s['rows_per_second']:.0f} rows/s)" if s['rows_per_second'] else "")
+            )
+
+    def totals(self) -> dict:
+        """Aggregate metrics over all recorded stages."""
+        wall = time.perf_counter() - self._run_start
+        rows = sum(s['rows'] for s in self.stages)
+        return {
+            'wall_seconds': round(wall, 6),
+            'cpu_seconds': round(sum(s['cpu_seconds'] for s in self.stages), 6),
+            'rows': rows,
+            'rows_per_second': round(rows / wall, 1) if wall > 0 else None,
+            'bytes_written': sum(s['bytes_written'] for s in self.stages),
+            'commits': sum(s['commits'] for s in self.stages),
+            'peak_rss_bytes': get_peak_rss_bytes(),
+        }
+
+    def to_dict(self, **extra) -> dict:
+        """Build the run report."""
+        report = {
+            'started_at': self.started_at.isoformat(),
+            'finished_at': (self.finished_at or datetime.now()).isoformat(),
+            'db_path': self.db.db_path,
+        }
+        report.update(extra)
+        report['stages'] = self.stages
+        report['totals'] = self.totals()
+        return report
+
+    def write_report(self, path: str, **extra) -> str:
+        """Write the JSON run report to path."""
+        self.finished_at = datetime.now()
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(**extra), f, indent=2, default=str)
+        logger.info(f"Run report written to {path}")
+        return path
+
+    def write_prometheus(self, path: str) -> str:
+        """Write stage metrics in the Prometheus text exposition format."""
+        gauges = [
+            ('wall_seconds', 'Wall-clock time per pipeline stage.'),
+            ('cpu_seconds', 'CPU time per pipeline stage.'),
+            ('build_seconds', 'Record generation time per pipeline stage.'),
+            ('write_seconds', 'Database write time per pipeline stage.'),
+            ('rows', 'Rows inserted, updated or deleted per pipeline stage.'),
+            ('rows_per_second', 'Row throughput per pipeline stage.'),
+            ('bytes_written', 'Bytes written to storage per pipeline stage.'),
+            ('db_size_bytes', 'Database size after each pipeline stage.'),
+            ('commits', 'Commits per pipeline stage.'),
+            ('peak_rss_bytes', 'Peak resident set size after each pipeline stage.'),
+        ]
+
+        lines = []
+        for key, help_text in gauges:
+            metric = f'asana_seed_stage_{key}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            for stage in self.stages:
+                if stage[key] is not None:
+                    lines.append(f'{metric}{{stage="{stage["stage"]}"}} {stage[key]}')
+
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        logger.info(f"Prometheus metrics written to {path}")
+        return path
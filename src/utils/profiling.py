@@ -0,0 +1,86 @@
+# Per-stage profiling hooks
+
+import cProfile
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cpu', 'mem')
+
+
+class StageProfiler:
+    """
+    Scope cProfile ('cpu') or tracemalloc ('mem') to individual pipeline stages.
+
+    Writes <stage>.pstats (cpu) or <stage>.alloc.txt (mem) to output_dir.
+    With mode=None, stage() is a bare pass-through.
+    """
+
+    def __init__(self, mode: str = None, output_dir: str = 'output/profiles', top_n: int = 25):
+        """Initialize profiler."""
+        if mode not in (None,) + PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {PROFILE_MODES})")
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        self.top_n = top_n
+
+    @contextmanager
+    def stage(self, name: str):
+        """Profile the enclosed block as pipeline stage name."""
+        if self.mode is None:
+            yield
+            return
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == 'cpu':
+            with self._profile_cpu(name):
+                yield
+        else:
+            with self._profile_memory(name):
+                yield
+
+    @contextmanager
+    def _profile_cpu(self, name: str):
+        """Run cProfile over the block and dump a pstats file."""
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = self.output_dir / f'{name}.pstats'
+            profiler.dump_stats(str(path))
+            logger.info(f"CPU profile for {name} written to {path}")
+
+    @contextmanager
+    def _profile_memory(self, name: str):
+        """Trace allocations over the block and write the top-N sites."""
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ])
+            top_stats = snapshot.statistics('lineno')
+
+            path = self.output_dir / f'{name}.alloc.txt'
+            with open(path, 'w') as f:
+                f.write(f"Stage: {name}\n")
+                f.write(f"Traced memory at end: {current / 1024:.1f} KiB, peak: {peak / 1024:.1f} KiB\n")
+                f.write(f"Top {self.top_n} allocation sites by size:\n\n")
+                for index, stat in enumerate(top_stats[:self.top_n], 1):
+                    frame = stat.traceback[0]
+                    f.write(
+                        f"{index:>3}. {frame.filename}:{frame.lineno}: "
+                        f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n"
+                    )
+            logger.info(f"Allocation report for {name} written to {path}")
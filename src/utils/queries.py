@@ -0,0 +1,120 @@
+# Common read queries against the generated database
+#
+# The composite and covering indexes in schema.sql are chosen for these
+# queries, and benchmarks/check_query_plans.py snapshots their EXPLAIN QUERY
+# PLAN output, so add a query here before adding an index for it.
+
+# name -> (description, SQL); parameters are positional. Queries selecting
+# whole rows back AsanaDatabase's typed read API (get_project_tasks() etc.)
+QUERY_SET = {
+    'project_tasks': (
+        "Tasks in a project, oldest first (idx_tasks_project_status)",
+        '''SELECT *
+           FROM tasks
+           WHERE project_id = ?
+           ORDER BY created_at''',
+    ),
+    'project_open_tasks': (
+        "Open tasks in a project, soonest due first (partial idx_tasks_project_open)",
+        '''SELECT *
+           FROM tasks
+           WHERE project_id = ? AND completed = 0
+           ORDER BY due_date''',
+    ),
+    'project_status_counts': (
+        "Task count per status in a project (covered by idx_tasks_project_status)",
+        '''SELECT status, COUNT(*)
+           FROM tasks
+           WHERE project_id = ?
+           GROUP BY status''',
+    ),
+    'section_tasks': (
+        "Tasks in a board column, oldest first (idx_tasks_section_created)",
+        '''SELECT *
+           FROM tasks
+           WHERE section_id = ?
+           ORDER BY created_at''',
+    ),
+    'user_tasks': (
+        "A user's tasks, soonest due first (covered by idx_task_assignees_user_task)",
+        '''SELECT t.*
+           FROM task_assignees ta
+           JOIN tasks t ON t.task_id = ta.task_id
+           WHERE ta.user_id = ?
+           ORDER BY t.due_date''',
+    ),
+    'user_open_tasks': (
+        "A user's open tasks, soonest due first (covered by idx_task_assignees_user_task)",
+        '''SELECT t.*
+           FROM task_assignees ta
+           JOIN tasks t ON t.task_id = ta.task_id
+           WHERE ta.user_id = ? AND t.completed = 0
+           ORDER BY t.due_date''',
+    ),
+    'task_assignees': (
+        "Names of a task's assignees (covered by the UNIQUE(task_id, user_id) index)",
+        '''SELECT u.user_id, u.name
+           FROM task_assignees ta
+           JOIN users u ON u.user_id = ta.user_id
+           WHERE ta.task_id = ?''',
+    ),
+    'overdue_tasks': (
+        "Oldest overdue open tasks (partial idx_tasks_open_due)",
+        '''SELECT *
+           FROM tasks
+           WHERE completed = 0 AND due_date < DATE('now')
+           ORDER BY due_date
+           LIMIT ?''',
+    ),
+    'user_overdue_counts': (
+        "Overdue open tasks per assignee, as in user_productivity (partial idx_tasks_open_due)",
+        '''SELECT ta.user_id, COUNT(*)
+           FROM tasks t
+           JOIN task_assignees ta ON ta.task_id = t.task_id
+           WHERE t.completed = 0 AND t.due_date < DATE('now')
+           GROUP BY ta.user_id''',
+    ),
+    'project_daily_activity': (
+        "A project's daily rollup rows in a date range (daily_project_rollup primary key)",
+        '''SELECT *
+           FROM daily_project_rollup
+           WHERE project_id = ? AND day BETWEEN ? AND ?
+           ORDER BY day''',
+    ),
+    'team_daily_activity': (
+        "A team's daily rollup rows in a date range (daily_team_rollup primary key)",
+        '''SELECT *
+           FROM daily_team_rollup
+           WHERE team_id = ? AND day BETWEEN ? AND ?
+           ORDER BY day''',
+    ),
+    'comment_thread': (
+        "A task's comments in order (idx_comments_task_created)",
+        '''SELECT *
+           FROM comments
+           WHERE task_id = ?
+           ORDER BY created_at''',
+    ),
+    'user_recent_comments': (
+        "A user's latest comments (idx_comments_user_created)",
+        '''SELECT comment_id, task_id, content, created_at
+           FROM comments
+           WHERE user_id = ?
+           ORDER BY created_at DESC
+           LIMIT 50''',
+    ),
+    'team_members': (
+        "Members of a team (covered by the UNIQUE(team_id, user_id) index)",
+        '''SELECT u.user_id, u.name, tm.role
+           FROM team_memberships tm
+           JOIN users u ON u.user_id = tm.user_id
+           WHERE tm.team_id = ?''',
+    ),
+    'tag_tasks': (
+        "Tasks carrying a tag (covered by idx_task_tags_tag_task)",
+        '''SELECT t.task_id, t.name, t.status
+           FROM task_tags tt
+           JOIN tasks t ON t.task_id = tt.task_id
+           WHERE tt.tag_id = ?''',
+    ),
+}
@@ -0,0 +1,192 @@
+# Rate limiting, retries and circuit breaking for external calls
+
+import time
+import random
+import logging
+import threading
+from typing import Callable
+from config import LLM_RESILIENCE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter."""
+
+    def __init__(self, rate: float, burst: int = None):
+        """Allow `rate` acquisitions per second on average and up to `burst` at once."""
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add the tokens accrued since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available; return the seconds waited."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Reserve the token now; a negative balance is the queue ahead of us
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing dependency.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    allow() returns False. Once `reset_seconds` have passed, one probe call
+    is allowed through (half-open); its success closes the circuit, its
+    failure opens it again for another reset period.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, name: str = 'circuit'):
+        """Initialize a closed circuit."""
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.name = name
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected (no state change)."""
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_seconds
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                logger.info(f"{self.name}: half-open, probing")
+                return True
+            return False
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"{self.name}: closed, calls resumed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit past the threshold or on a failed probe."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                logger.warning(
+                    f"{self.name}: open after {self.failures} consecutive failure(s), "
+                    f"retrying in {self.reset_seconds:g}s"
+                )
+
+
+class ResilientCaller:
+    """
+    Call a function under a rate limit, with exponential-backoff retries
+    and a circuit breaker; configured from LLM_RESILIENCE_CONFIG by default.
+    """
+
+    def __init__(self, name: str = 'LLM', config: dict = None):
+        """Initialize limiter and breaker from config."""
+        config = {**LLM_RESILIENCE_CONFIG, **(config or {})}
+        self.limiter = TokenBucket(config['requests_per_second'], config['burst'])
+        self.breaker = CircuitBreaker(config['breaker_failures'], config['breaker_reset_seconds'], name)
+        self.max_retries = config['max_retries']
+        self.backoff_base = config['backoff_base']
+        self.backoff_max = config['backoff_max']
+        self.stats = {'retries': 0, 'rejected': 0, 'throttled_seconds': 0.0}
+        # Jitter must not consume the seeded global random stream
+        self._rng = random.Random()
+        # Guards settled events, so a call's outcome is recorded exactly once
+        self._settle_lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number attempt (1-based), with full jitter."""
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def call(self, fn: Callable, *args, settled: threading.Event = None, **kwargs):
+        """
+        Call fn, retrying failures with backoff.
+
+        Raises CircuitOpenError without calling fn while the circuit is open,
+        or fn's last exception once retries are exhausted. With a settled
+        event, the outcome goes to the breaker only if abandon(settled) has
+        not claimed the call first, and an abandoned call is not retried.
+        """
+        if not self.breaker.allow():
+            self.stats['rejected'] += 1
+            raise CircuitOpenError(f"{self.breaker.name} circuit is open")
+
+        attempt = 0
+        while True:
+            self.stats['throttled_seconds'] += self.limiter.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                attempt += 1
+                if (
+                    attempt > self.max_retries
+                    or self.breaker.state != CircuitBreaker.CLOSED
+                    or (settled is not None and settled.is_set())
+                ):
+                    self._settle(settled, self.breaker.record_failure)
+                    raise
+                self.stats['retries'] += 1
+                delay = self.backoff(attempt)
+                logger.debug(f"{self.breaker.name} call failed ({e}); retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            self._settle(settled, self.breaker.record_success)
+            return result
+
+    def abandon(self, settled: threading.Event) -> bool:
+        """
+        Claim a call the caller stopped waiting for (e.g. on a timeout).
+
+        Returns True if the call had not settled yet; its outcome is then the
+        caller's to record, and call() will no longer record it.
+        """
+        with self._settle_lock:
+            if settled.is_set():
+                return False
+            settled.set()
+            return True
+
+    def _settle(self, settled: threading.Event, record: Callable):
+        """Record a call's outcome unless abandon() already claimed it."""
+        if settled is None:
+            record()
+            return
+        with self._settle_lock:
+            if settled.is_set():
+                return
+            settled.set()
+        record()
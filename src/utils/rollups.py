@@ -0,0 +1,90 @@
+# Daily activity rollups per project and team
+#
+# Built in bulk after the load: one pass over tasks and comments turns
+# every creation, completion and comment into a dated event, events are
+# summed per project and day, and a running sum gives the open task count
+# at the end of each day. Project rows are dense from the project's first
+# event to the last day in the dataset, so a trend is a primary-key range
+# read with no gaps to fill. Team rows sum their projects' rows.
+#
+# Unlike the materialized workload tables there are no triggers; rebuild
+# the rollups after changing the data.
+
+ROLLUP_TABLES = ['daily_project_rollup', 'daily_team_rollup']
+
+CREATE_TABLES_SQL = '''
+CREATE TABLE daily_project_rollup (
+    project_id TEXT NOT NULL,
+    day DATE NOT NULL,
+    tasks_created INTEGER NOT NULL,
+    tasks_completed INTEGER NOT NULL,
+    open_tasks INTEGER NOT NULL,  -- At the end of day
+    comments_created INTEGER NOT NULL,
+    PRIMARY KEY (project_id, day)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_daily_project_rollup_day ON daily_project_rollup(day);
+
+CREATE TABLE daily_team_rollup (
+    team_id TEXT NOT NULL,
+    day DATE NOT NULL,
+    tasks_created INTEGER NOT NULL,
+    tasks_completed INTEGER NOT NULL,
+    open_tasks INTEGER NOT NULL,
+    comments_created INTEGER NOT NULL,
+    PRIMARY KEY (team_id, day)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_daily_team_rollup_day ON daily_team_rollup(day);
+'''
+
+POPULATE_SQL = '''
+INSERT INTO daily_project_rollup
+WITH RECURSIVE
+events(project_id, day, created, completed, comments) AS (
+    SELECT project_id, DATE(created_at), 1, 0, 0 FROM tasks
+    UNION ALL
+    SELECT project_id, DATE(completed_at), 0, 1, 0 FROM tasks WHERE completed_at IS NOT NULL
+    UNION ALL
+    SELECT t.project_id, DATE(c.created_at), 0, 0, 1
+    FROM comments c JOIN tasks t ON t.task_id = c.task_id
+),
+daily AS (
+    SELECT project_id, day, SUM(created) AS created, SUM(completed) AS completed, SUM(comments) AS comments
+    FROM events
+    GROUP BY project_id, day
+),
+calendar(project_id, day, last_day) AS (
+    SELECT project_id, MIN(day), (SELECT MAX(day) FROM daily) FROM daily GROUP BY project_id
+    UNION ALL
+    SELECT project_id, DATE(day, '+1 day'), last_day FROM calendar WHERE day < last_day
+)
+SELECT
+    cal.project_id,
+    cal.day,
+    COALESCE(d.created, 0),
+    COALESCE(d.completed, 0),
+    SUM(COALESCE(d.created, 0) - COALESCE(d.completed, 0))
+        OVER (PARTITION BY cal.project_id ORDER BY cal.day),
+    COALESCE(d.comments, 0)
+FROM calendar cal
+LEFT JOIN daily d ON d.project_id = cal.project_id AND d.day = cal.day;
+
+INSERT INTO daily_team_rollup
+SELECT
+    p.team_id,
+    r.day,
+    SUM(r.tasks_created),
+    SUM(r.tasks_completed),
+    SUM(r.open_tasks),
+    SUM(r.comments_created)
+FROM daily_project_rollup r
+JOIN projects p ON p.project_id = r.project_id
+WHERE p.team_id IS NOT NULL
+GROUP BY p.team_id, r.day;
+'''
+
+DROP_SQL = '''
+DROP TABLE IF EXISTS daily_project_rollup;
+DROP TABLE IF EXISTS daily_team_rollup;
+'''
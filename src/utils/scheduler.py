@@ -0,0 +1,113 @@
+# Dependency-aware stage scheduler
+
+import sys
+import logging
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class InlineExecutor:
+    """Executor that runs each submitted call immediately in the calling thread."""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Run fn and return an already completed future."""
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Nothing to release."""
+
+
+def shutdown_executor(executor, wait: bool = True):
+    """Shut executor down, cancelling calls that have not started where supported (Python 3.9+)."""
+    if sys.version_info >= (3, 9):
+        executor.shutdown(wait=wait, cancel_futures=True)
+    else:
+        executor.shutdown(wait=wait)
+
+
+def get_executor(workers: int):
+    """Process pool for workers > 1, otherwise inline execution."""
+    if workers > 1:
+        # Imported here: pulls in multiprocessing, which inline runs never need
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=workers)
+    return InlineExecutor()
+
+
+def map_unordered(executor, fn: Callable, calls: Iterable[tuple], max_pending: int) -> Iterator:
+    """
+    Yield (args, result) for fn(*args) over calls in completion order.
+
+    At most max_pending calls are in flight, so results are consumed about
+    as fast as they are produced instead of piling up in memory.
+    """
+    calls = iter(calls)
+    running = {}
+    while True:
+        while len(running) < max_pending:
+            args = next(calls, None)
+            if args is None:
+                break
+            running[executor.submit(fn, *args)] = args
+        if not running:
+            return
+        done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+        for future in done:
+            yield running.pop(future), future.result()
+
+
+class StageScheduler:
+    """
+    Run a DAG of stages.
+
+    A stage's build is submitted to the worker pool as soon as every stage
+    it requires has been written. Writes happen one at a time on the calling
+    thread, which keeps a single database connection as the only writer while
+    builds of independent stages run concurrently.
+    """
+
+    def __init__(self, requires: Dict[str, List[str]], workers: int = 1):
+        """Initialize scheduler with {stage: [required stages]} in a valid order."""
+        self.requires = requires
+        self.workers = workers
+
+    def run(self, selected: List[str], submit: Callable, write: Callable):
+        """
+        Run the selected stages.
+
+        submit(executor, stage) must return a Future for the stage's build;
+        write(stage, result) is called with its result. Required stages that
+        are not selected are treated as already written.
+        """
+        pending = [stage for stage in self.requires if stage in selected]
+        written = {stage for stage in self.requires if stage not in selected}
+        running = {}
+
+        executor = get_executor(self.workers)
+        try:
+            while pending or running:
+                for stage in [s for s in pending if all(r in written for r in self.requires[s])]:
+                    pending.remove(stage)
+                    running[submit(executor, stage)] = stage
+                    logger.debug(f"Submitted stage {stage}")
+
+                if not running:
+                    raise RuntimeError(f"Unsatisfiable stage dependencies: {', '.join(pending)}")
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    write(stage, future.result())
+                    written.add(stage)
+        except BaseException:
+            shutdown_executor(executor, wait=False)
+            raise
+        else:
+            executor.shutdown()
@@ -0,0 +1,99 @@
+# Full-text search index over task names, descriptions and comments
+#
+# tasks_fts and comments_fts are FTS5 external-content tables: they store
+# only the index and read the text back from tasks and comments by rowid.
+# They are filled in bulk with the 'rebuild' command once the data is loaded;
+# triggers then apply every later insert, delete and text update, so rows
+# added or edited after the load are searchable immediately.
+
+SEARCH_TABLES = ['tasks_fts', 'comments_fts']
+
+CREATE_TABLES_SQL = '''
+CREATE VIRTUAL TABLE tasks_fts USING fts5(
+    name, description, content='tasks', tokenize='{tokenizer}'
+);
+
+CREATE VIRTUAL TABLE comments_fts USING fts5(
+    content, content='comments', tokenize='{tokenizer}'
+);
+'''
+
+POPULATE_SQL = '''
+INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild');
+INSERT INTO comments_fts(comments_fts) VALUES ('rebuild');
+'''
+
+# An external-content index is updated by deleting the old text with the
+# 'delete' command and inserting the new text under the same rowid
+CREATE_TRIGGERS_SQL = '''
+CREATE TRIGGER fts_tasks_insert AFTER INSERT ON tasks
+BEGIN
+    INSERT INTO tasks_fts(rowid, name, description) VALUES (NEW.rowid, NEW.name, NEW.description);
+END;
+
+CREATE TRIGGER fts_tasks_delete AFTER DELETE ON tasks
+BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, name, description)
+    VALUES ('delete', OLD.rowid, OLD.name, OLD.description);
+END;
+
+CREATE TRIGGER fts_tasks_update AFTER UPDATE OF name, description ON tasks
+BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, name, description)
+    VALUES ('delete', OLD.rowid, OLD.name, OLD.description);
+    INSERT INTO tasks_fts(rowid, name, description) VALUES (NEW.rowid, NEW.name, NEW.description);
+END;
+
+CREATE TRIGGER fts_comments_insert AFTER INSERT ON comments
+BEGIN
+    INSERT INTO comments_fts(rowid, content) VALUES (NEW.rowid, NEW.content);
+END;
+
+CREATE TRIGGER fts_comments_delete AFTER DELETE ON comments
+BEGIN
+    INSERT INTO comments_fts(comments_fts, rowid, content) VALUES ('delete', OLD.rowid, OLD.content);
+END;
+
+CREATE TRIGGER fts_comments_update AFTER UPDATE OF content ON comments
+BEGIN
+    INSERT INTO comments_fts(comments_fts, rowid, content) VALUES ('delete', OLD.rowid, OLD.content);
+    INSERT INTO comments_fts(rowid, content) VALUES (NEW.rowid, NEW.content);
+END;
+'''
+
+DROP_SQL = '''
+DROP TRIGGER IF EXISTS fts_tasks_insert;
+DROP TRIGGER IF EXISTS fts_tasks_delete;
+DROP TRIGGER IF EXISTS fts_tasks_update;
+DROP TRIGGER IF EXISTS fts_comments_insert;
+DROP TRIGGER IF EXISTS fts_comments_delete;
+DROP TRIGGER IF EXISTS fts_comments_update;
+DROP TABLE IF EXISTS tasks_fts;
+DROP TABLE IF EXISTS comments_fts;
+'''
+
+# Ranked matches per searchable table, best first. bm25() scores are
+# negative (lower is better); task names weigh more than descriptions.
+SEARCH_SQL = {
+    'tasks': '''
+SELECT t.*
+FROM tasks_fts
+JOIN tasks t ON t.rowid = tasks_fts.rowid
+WHERE tasks_fts MATCH ?
+ORDER BY bm25(tasks_fts, {name_weight}, 1.0)
+LIMIT ?
+''',
+    'comments': '''
+SELECT c.*
+FROM comments_fts
+JOIN comments c ON c.rowid = comments_fts.rowid
+WHERE comments_fts MATCH ?
+ORDER BY bm25(comments_fts)
+LIMIT ?
+''',
+}
+
+
+def to_match_query(text: str) -> str:
+    """FTS5 query matching rows that contain every word of text, with FTS5 syntax quoted away."""
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
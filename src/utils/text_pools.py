@@ -0,0 +1,76 @@
+# Precomputed pools of generated text
+
+import sys
+import math
+import random
+import itertools
+from functools import reduce
+from fractions import Fraction
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+class TextPool:
+    """
+    Every string a template can produce, expanded once and drawn by index.
+
+    Each distinct string is interned and stored once; `slots` repeats
+    references to it in proportion to its probability, so a draw is a
+    single random index into a tuple. None is allowed as a value (e.g.
+    "no description").
+    """
+
+    def __init__(self, weighted: Iterable[Tuple[Optional[str], int]]):
+        """Build pool from (text, integer weight) pairs; repeated texts add up."""
+        interned = {}
+        slots = []
+        for text, weight in weighted:
+            if text is not None:
+                text = interned.setdefault(text, sys.intern(text))
+            slots.extend([text] * weight)
+        if not slots:
+            raise ValueError("TextPool needs at least one entry")
+        self.slots = tuple(slots)
+        self.strings = tuple(interned.values())
+
+    @classmethod
+    def uniform(cls, texts: Iterable[Optional[str]]) -> 'TextPool':
+        """Pool drawing each entry of texts with equal probability."""
+        return cls((text, 1) for text in texts)
+
+    @classmethod
+    def expand(cls, template: str, *choices: Sequence[str]) -> 'TextPool':
+        """Pool of template.format(...) over every combination of choices, equally likely."""
+        return cls.uniform(template.format(*combo) for combo in itertools.product(*choices))
+
+    @classmethod
+    def mix(cls, parts: List[Tuple[float, 'TextPool']]) -> 'TextPool':
+        """Pool drawing from parts[i][1] with probability parts[i][0]."""
+        weights = [
+            Fraction(probability).limit_denominator(10 ** 6) / len(pool.slots)
+            for probability, pool in parts
+        ]
+        # Two-argument gcd only: math.lcm and variadic gcd need Python 3.9
+        scale = reduce(lambda a, b: a * b // math.gcd(a, b), (weight.denominator for weight in weights), 1)
+        counts = [int(weight * scale) for weight in weights]
+        divisor = reduce(math.gcd, (count for count in counts if count), 0)
+        return cls(
+            (text, count // divisor)
+            for count, (_, pool) in zip(counts, parts)
+            if count
+            for text in pool.slots
+        )
+
+    def __len__(self) -> int:
+        """Number of distinct strings."""
+        return len(self.strings)
+
+    def draw(self) -> Optional[str]:
+        """One entry, drawn with the global random generator."""
+        return self.slots[int(random.random() * len(self.slots))]
+
+    def draw_many(self, count: int) -> List[Optional[str]]:
+        """count entries drawn independently."""
+        slots = self.slots
+        size = len(slots)
+        rand = random.random
+        return [slots[int(rand() * size)] for _ in range(count)]